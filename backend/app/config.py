@@ -0,0 +1,20 @@
+from functools import lru_cache
+from typing import Tuple
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default local dev origins
+DEFAULT_FRONTEND_ORIGINS = (
+    "http://localhost:3000",
+    "http://localhost:5173",
+)
+
+@lru_cache(maxsize=None)
+def get_frontend_origins() -> Tuple[str, ...]:
+    """Allowed CORS origins: the dev defaults plus FRONTEND_ORIGINS (comma-separated)"""
+    extra = os.environ.get("FRONTEND_ORIGINS", "").strip()
+    return DEFAULT_FRONTEND_ORIGINS + tuple(
+        o.strip() for o in extra.split(",") if o.strip()
+    )
@@ -0,0 +1,33 @@
+"""
+Logging setup for the TAO SDLC API
+Request handlers only enqueue log records; a background listener thread
+formats them and writes to stderr.
+"""
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Attach a QueueHandler to the root logger and start its listener"""
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+def shutdown_logging(listener: logging.handlers.QueueListener):
+    """Flush queued records and detach the QueueHandler"""
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
@@ -1,58 +1,90 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import importlib
+import orjson
 import os
-from app.routers import projects, phases, approvals, ai_copilot, users, integrations, chat, auth
-from app.database import engine, Base
+import re
+from app.config import get_frontend_origins
+from app.database import engine, async_engine, Base
+from app.logging_config import setup_logging, shutdown_logging
+from app.services.integration_service import get_integration_service
+from app.services.log_buffer import get_log_buffer
 from app import models, models_integrations  # Import all models
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Routers are imported lazily at startup so importing app.main does not pull
+# in the AI/RAG service modules (OpenAI, pgvector, document parsers).
+ROUTERS = [
+    ("app.routers.auth", "/api/auth", "Authentication"),
+    ("app.routers.users", "/api/users", "Users"),
+    ("app.routers.projects", "/api/projects", "Projects"),
+    ("app.routers.phases", "/api/phases", "Phases"),
+    ("app.routers.approvals", "/api/approvals", "Approvals"),
+    ("app.routers.ai_copilot", "/api/ai", "AI Copilot"),
+    ("app.routers.integrations", "/api/integrations", "Integrations"),
+    ("app.routers.chat", "/api/chat", "AI Chat"),
+]
+
+def include_routers(app: FastAPI):
+    """Import each router module and register it on the app"""
+    for module_name, prefix, tag in ROUTERS:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=[tag])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = setup_logging()
+    # Create database tables at startup rather than on import. Set
+    # TAO_AUTO_CREATE_TABLES=0 when the schema is managed externally.
+    if os.environ.get("TAO_AUTO_CREATE_TABLES", "1") == "1":
+        Base.metadata.create_all(bind=engine)
+        models_integrations.ensure_config_unique_index(engine)
+    include_routers(app)
+    log_buffer = get_log_buffer()
+    log_buffer.start()
+    yield
+    await log_buffer.stop()
+    await get_integration_service().close()
+    # Imported here so importing app.main does not load the OpenAI SDK
+    from app.services.ai_service import get_ai_service
+    await get_ai_service().close()
+    await async_engine.dispose()
+    shutdown_logging(log_listener)
 
 app = FastAPI(
     title="TAO SDLC API",
     description="AI-Augmented Software Development Lifecycle Management System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS Configuration
-# Default local dev origins
-origins = [
-    "http://localhost:3000",
-    "http://localhost:5173",
-]
-
-# Allow adding extra origins via FRONTEND_ORIGINS env var (comma-separated)
-extra = os.environ.get("FRONTEND_ORIGINS", "").strip()
-if extra:
-    origins += [o.strip() for o in extra.split(",") if o.strip()]
+# Match all configured origins with one regex instead of a list scan per request
+origin_regex = "(" + "|".join(re.escape(o) for o in get_frontend_origins()) + ")"
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origin_regex=origin_regex,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=600,  # Let browsers cache preflight responses for 10 minutes
 )
 
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(users.router, prefix="/api/users", tags=["Users"])
-app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
-app.include_router(phases.router, prefix="/api/phases", tags=["Phases"])
-app.include_router(approvals.router, prefix="/api/approvals", tags=["Approvals"])
-app.include_router(ai_copilot.router, prefix="/api/ai", tags=["AI Copilot"])
-app.include_router(integrations.router, prefix="/api/integrations", tags=["Integrations"])
-app.include_router(chat.router, prefix="/api/chat", tags=["AI Chat"])
+# Constant bodies for the probe endpoints, serialized once at import
+_ROOT = orjson.dumps({
+    "message": "TAO SDLC API",
+    "version": "1.0.0",
+    "status": "running"
+})
+_HEALTH = orjson.dumps({"status": "healthy"})
 
 @app.get("/")
 async def root():
-    return {
-        "message": "TAO SDLC API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+    return Response(content=_ROOT, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
-
+    return Response(content=_HEALTH, media_type="application/json")
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, JSONType
+from types import MappingProxyType
 import enum
 
 class PhaseStatus(str, enum.Enum):
@@ -81,6 +83,17 @@ PHASE_CONFIGS = {
     }
 }
 
+# Freeze the configs so callers can share them without defensive copies
+PHASE_CONFIGS = MappingProxyType({
+    phase_num: MappingProxyType({
+        **config,
+        "key_activities": tuple(config["key_activities"]),
+        "deliverables": tuple(config["deliverables"]),
+        "approvers": tuple(config["approvers"])
+    })
+    for phase_num, config in PHASE_CONFIGS.items()
+})
+
 class User(Base):
     __tablename__ = "users"
     
@@ -111,10 +124,13 @@ class Project(Base):
 
 class ProjectStakeholder(Base):
     __tablename__ = "project_stakeholders"
+    __table_args__ = (
+        Index("ix_ps_project_user", "project_id", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     role = Column(String)  # BR-owner, Logical-Arc-owner, Deployment-Arc-owner, etc.
     
     project = relationship("Project", back_populates="stakeholders")
@@ -124,11 +140,11 @@ class Phase(Base):
     __tablename__ = "phases"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     phase_number = Column(Integer)  # 1-6
     phase_name = Column(String)
     status = Column(Enum(PhaseStatus), default=PhaseStatus.NOT_STARTED)
-    data = Column(JSON)  # Store phase-specific data
+    data = Column(MutableDict.as_mutable(JSONType))  # Store phase-specific data
     ai_confidence_score = Column(Integer, default=0)
     start_date = Column(DateTime(timezone=True))
     end_date = Column(DateTime(timezone=True))
@@ -145,8 +161,8 @@ class Approval(Base):
     __tablename__ = "approvals"
     
     id = Column(Integer, primary_key=True, index=True)
-    phase_id = Column(Integer, ForeignKey("phases.id"))
-    approver_id = Column(Integer, ForeignKey("users.id"))
+    phase_id = Column(Integer, ForeignKey("phases.id"), index=True)
+    approver_id = Column(Integer, ForeignKey("users.id"), index=True)
     status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING)
     comments = Column(Text)
     approved_at = Column(DateTime(timezone=True))
@@ -159,8 +175,8 @@ class AIInteraction(Base):
     __tablename__ = "ai_interactions"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
-    phase_id = Column(Integer, ForeignKey("phases.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    phase_id = Column(Integer, ForeignKey("phases.id"), index=True)
     user_query = Column(Text)
     ai_response = Column(Text)
     confidence_score = Column(Integer)
@@ -1,15 +1,20 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, delete, inspect, select, text
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, JSONType
 
 class IntegrationConfig(Base):
     __tablename__ = "integration_configs"
+    __table_args__ = (
+        Index("uq_intconfig_proj_type", "project_id", "integration_type", unique=True),
+        Index("ix_intconfig_proj_type_active", "project_id", "integration_type", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     integration_type = Column(String)  # jira, github, confluence, slack, etc.
-    config = Column(JSON)  # Store integration-specific configuration
+    config = deferred(Column(JSONType))  # Store integration-specific configuration (loaded on demand)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -23,7 +28,7 @@ class AutomationWorkflow(Base):
     workflow_name = Column(String)
     workflow_type = Column(String)  # code_generation, test_generation, deployment, etc.
     trigger_event = Column(String)
-    config = Column(JSON, default={})
+    config = Column(JSONType, default={})
     is_active = Column(Boolean, default=True)
     last_run_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -32,14 +37,51 @@ class AutomationWorkflow(Base):
 
 class IntegrationLog(Base):
     __tablename__ = "integration_logs"
+    __table_args__ = (
+        Index("ix_intlog_proj_id", "project_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     integration_type = Column(String)
     action = Column(String)
     status = Column(String)
-    request_data = Column(JSON)
-    response_data = Column(JSON)
+    # Payload blobs are loaded on demand
+    request_data = deferred(Column(JSONType))
+    response_data = deferred(Column(JSONType))
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# Advisory lock key serializing ensure_config_unique_index across workers
+CONFIG_INDEX_LOCK_KEY = 0x1C0F16
+
+def ensure_config_unique_index(bind):
+    """
+    Create uq_intconfig_proj_type on a database that predates it.
+    
+    create_all skips existing tables, and older versions could leave several
+    configs per project and integration type, so duplicates are removed first,
+    keeping the newest row of each pair. Every worker runs this at startup, so
+    on PostgreSQL the check, delete and create happen under a transaction-scoped
+    advisory lock: the first worker migrates and the others then find the index.
+    """
+    table = IntegrationConfig.__table__
+    index = next(ix for ix in table.indexes if ix.name == "uq_intconfig_proj_type")
+    newest = select(func.max(table.c.id)).group_by(table.c.project_id, table.c.integration_type)
+    
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CONFIG_INDEX_LOCK_KEY})
+        
+        inspector = inspect(conn)
+        if not inspector.has_table(table.name):
+            return
+        if any(ix["name"] == index.name for ix in inspector.get_indexes(table.name)):
+            return
+        
+        conn.execute(delete(table).where(
+            table.c.project_id.is_not(None),
+            table.c.integration_type.is_not(None),
+            table.c.id.not_in(newest)
+        ))
+        conn.execute(CreateIndex(index, if_not_exists=True))
@@ -1,24 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session, joinedload
 from typing import List
-from datetime import datetime
+from itertools import chain
+from openai import NotFoundError
 from app import models, schemas
-from app.database import get_db
-from app.services.ai_service import AIService
-from app.services.document_parser import DocumentParser
-import tempfile
-import os
+from app.database import SessionLocal, get_db
+from app.services.ai_service import get_ai_service
+from app.services.document_parser import get_document_parser
+import asyncio
+import json
+import logging
 
 router = APIRouter()
-ai_service = AIService()
-doc_parser = DocumentParser()
+logger = logging.getLogger(__name__)
+
+def _persist_interaction(project_id: int, phase_id: int, user_query: str, response: dict):
+    """Store an AI interaction using its own session (runs as a background task)"""
+    db = SessionLocal()
+    try:
+        db.add(models.AIInteraction(
+            project_id=project_id,
+            phase_id=phase_id,
+            user_query=user_query,
+            ai_response=response["response"],
+            confidence_score=response["confidence_score"]
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to store AI interaction")
+    finally:
+        db.close()
 
 @router.post("/query", response_model=schemas.AIResponse)
-async def ai_query(query: schemas.AIQuery, db: Session = Depends(get_db)):
+async def ai_query(
+    query: schemas.AIQuery,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Process AI query for a specific project phase
     """
     try:
+        ai_service = get_ai_service()
+        
         # Get phase context
         phase = db.query(models.Phase).filter(models.Phase.id == query.phase_id).first()
         if not phase:
@@ -31,16 +58,14 @@ async def ai_query(query: schemas.AIQuery, db: Session = Depends(get_db)):
             query.context
         )
         
-        # Store interaction
-        interaction = models.AIInteraction(
-            project_id=query.project_id,
-            phase_id=query.phase_id,
-            user_query=query.query,
-            ai_response=response["response"],
-            confidence_score=response["confidence_score"]
+        # Store interaction after the response has been sent
+        background_tasks.add_task(
+            _persist_interaction,
+            query.project_id,
+            query.phase_id,
+            query.query,
+            response
         )
-        db.add(interaction)
-        db.commit()
         
         return schemas.AIResponse(
             response=response["response"],
@@ -51,6 +76,54 @@ async def ai_query(query: schemas.AIQuery, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _persist_streamed_interaction(project_id: int, phase_id: int, user_query: str, chunks: List[str]):
+    """Store a streamed AI interaction once all chunks have been sent"""
+    _persist_interaction(project_id, phase_id, user_query, {
+        "response": "".join(chunks),
+        "confidence_score": 85
+    })
+
+@router.post("/query/stream")
+async def ai_query_stream(
+    query: schemas.AIQuery,
+    db: Session = Depends(get_db)
+):
+    """
+    Process AI query for a specific project phase, streaming the answer as
+    server-sent events
+    """
+    phase = db.query(models.Phase).filter(models.Phase.id == query.phase_id).first()
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
+    
+    ai_service = get_ai_service()
+    chunks = await ai_service.process_query(
+        query.query,
+        phase.phase_name,
+        query.context,
+        stream=True
+    )
+    sent: List[str] = []
+    
+    async def event_stream():
+        async for chunk in chunks:
+            sent.append(chunk)
+            yield f"data: {json.dumps({'delta': chunk})}\n\n"
+        yield f"data: {json.dumps({'done': True})}\n\n"
+    
+    # Store the full interaction after the stream completes
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        background=BackgroundTask(
+            _persist_streamed_interaction,
+            query.project_id,
+            query.phase_id,
+            query.query,
+            sent
+        )
+    )
+
 @router.post("/generate/{phase_id}")
 async def generate_content(
     phase_id: int,
@@ -59,6 +132,10 @@ async def generate_content(
 ):
     """
     Generate phase-specific content (PRD, FSD, Architecture, etc.)
+    
+    content_type "prd_brd" generates the PRD and BRD together in one request.
+    With "batch": true, PRD/BRD generation goes through the OpenAI Batch API
+    and the response carries a batch_id to poll at /batches/{batch_id}.
     """
     phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
     if not phase:
@@ -78,9 +155,67 @@ async def generate_content(
         "project": request_data.get("project")
     }
     
-    result = await ai_service.generate_content(phase.phase_name, content_type, generation_data)
+    ai_service = get_ai_service()
+    result = await ai_service.generate_content(
+        phase.phase_name,
+        content_type,
+        generation_data,
+        batch=bool(request_data.get("batch"))
+    )
     return result
 
+@router.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """
+    Status of a batch generation, with the documents once it has completed
+    """
+    ai_service = get_ai_service()
+    try:
+        return await ai_service.get_batch_results(batch_id)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+@router.post("/generate/{phase_id}/stream")
+async def generate_content_stream(
+    phase_id: int,
+    request_data: dict,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate a PRD or BRD, streaming the document as server-sent events
+    
+    content_type "epics" streams one {"epic": ...} event per generated epic,
+    each sent as soon as it is complete.
+    """
+    phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
+    
+    content_type = request_data.get("content_type")
+    if content_type not in ("prd", "brd", "epics"):
+        raise HTTPException(status_code=400, detail="content_type must be prd, brd or epics")
+    
+    generation_data = {
+        "requirements": request_data.get("requirements", []),
+        "gherkinRequirements": request_data.get("gherkinRequirements", []),
+        "prd": request_data.get("prd"),
+        "brd": request_data.get("brd"),
+        "project": request_data.get("project")
+    }
+    
+    ai_service = get_ai_service()
+    if content_type == "epics":
+        events = ({'epic': epic} async for epic in ai_service.stream_epics(generation_data))
+    else:
+        events = ({'delta': chunk} async for chunk in ai_service.stream_document(content_type, generation_data))
+    
+    async def event_stream():
+        async for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+        yield f"data: {json.dumps({'done': True, 'confidence_score': 85})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.post("/extract-requirements")
 async def extract_requirements(
     files: List[UploadFile] = File(...),
@@ -96,38 +231,34 @@ async def extract_requirements(
         - count: Number of requirements extracted
     """
     try:
+        ai_service = get_ai_service()
+        doc_parser = get_document_parser()
+        
         # Get project info
         project = db.query(models.Project).filter(models.Project.id == project_id).first()
         project_name = project.name if project else "Project"
         
-        all_requirements = []
-        
-        print(f"[INFO] Extracting requirements from {len(files)} file(s) for project: {project_name}")
+        logger.info("Extracting requirements from %d file(s) for project: %s", len(files), project_name)
         
-        for file in files:
-            print(f"[INFO] Processing file: {file.filename}")
+        async def extract_from_file(file: UploadFile) -> List[dict]:
+            logger.info("Processing file: %s", file.filename)
+            
+            content = await file.read()
+            
+            # Parse document in memory, off the event loop
+            logger.info("Parsing document: %s", file.filename)
+            parsed_content = await asyncio.to_thread(doc_parser.parse_bytes, content, file.filename)
             
-            # Save file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-                content = await file.read()
-                tmp.write(content)
-                tmp_path = tmp.name
+            # Extract and convert to Gherkin format using OpenAI
+            logger.info("Extracting requirements with OpenAI from: %s", file.filename)
+            gherkin_requirements = await ai_service.convert_to_gherkin(parsed_content)
             
-            try:
-                # Parse document
-                print(f"[INFO] Parsing document: {file.filename}")
-                parsed_content = doc_parser.parse_document(tmp_path, file.filename)
-                
-                # Extract and convert to Gherkin format using OpenAI
-                print(f"[INFO] Extracting requirements with OpenAI from: {file.filename}")
-                gherkin_requirements = await ai_service.convert_to_gherkin(parsed_content)
-                
-                print(f"[OK] Extracted {len(gherkin_requirements)} requirements from {file.filename}")
-                all_requirements.extend(gherkin_requirements)
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+            logger.info("Extracted %d requirements from %s", len(gherkin_requirements), file.filename)
+            return gherkin_requirements
+        
+        # Process all files concurrently; results keep the upload order
+        results = await asyncio.gather(*(extract_from_file(file) for file in files))
+        all_requirements = list(chain.from_iterable(results))
         
         if not all_requirements:
             return {
@@ -137,7 +268,7 @@ async def extract_requirements(
                 "message": "No requirements could be extracted from the uploaded documents. Please check the document format and content."
             }
         
-        print(f"[SUCCESS] Extraction complete: {len(all_requirements)} requirements extracted")
+        logger.info("Extraction complete: %d requirements extracted", len(all_requirements))
         
         return {
             "status": "success",
@@ -146,9 +277,7 @@ async def extract_requirements(
             "message": f"Successfully extracted {len(all_requirements)} requirements. You can now generate PRD and BRD."
         }
     except Exception as e:
-        print(f"[ERROR] Failed to extract requirements: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to extract requirements")
         raise HTTPException(status_code=500, detail=f"Failed to extract requirements: {str(e)}")
 
 @router.post("/analyze-risks/{phase_id}")
@@ -164,14 +293,14 @@ async def analyze_risks(
         - count: Number of risks identified
     """
     try:
-        # Get phase and verify it's Requirements phase
-        phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
+        # Get phase together with its project in a single query
+        phase = db.query(models.Phase).options(
+            joinedload(models.Phase.project)
+        ).filter(models.Phase.id == phase_id).first()
         if not phase:
             raise HTTPException(status_code=404, detail="Phase not found")
         
-        # Get project info
-        project = db.query(models.Project).filter(models.Project.id == phase.project_id).first()
-        project_name = project.name if project else "Project"
+        project_name = phase.project.name if phase.project else "Project"
         
         # Get requirements from phase data
         phase_data = phase.data or {}
@@ -189,18 +318,20 @@ async def analyze_risks(
                 "message": "No requirements found. Please extract requirements first."
             }
         
-        print(f"[INFO] Analyzing risks for {len(requirements)} requirements in project: {project_name}")
+        logger.info("Analyzing risks for %d requirements in project: %s", len(requirements), project_name)
         
         # Analyze risks using OpenAI
+        ai_service = get_ai_service()
         risks = await ai_service.analyze_risks(requirements, project_name)
         
-        # Store risks in phase data
-        phase_data['risks'] = risks
-        phase.data = phase_data
-        phase.updated_at = datetime.utcnow()
+        # Store risks in phase data; Phase.data is a MutableDict, so the
+        # in-place update is tracked and updated_at is stamped by the DB
+        if phase.data is None:
+            phase.data = {}
+        phase.data['risks'] = risks
         db.commit()
         
-        print(f"[SUCCESS] Risk analysis complete: {len(risks)} risks identified")
+        logger.info("Risk analysis complete: %d risks identified", len(risks))
         
         return {
             "status": "success",
@@ -212,8 +343,6 @@ async def analyze_risks(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ERROR] Failed to analyze risks: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to analyze risks")
         raise HTTPException(status_code=500, detail=f"Failed to analyze risks: {str(e)}")
 
@@ -4,26 +4,31 @@ Handles RAG-based chat queries with context awareness
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Dict, Any, Literal
 from app.database import get_db
-from app.services.rag_chat_service import RAGChatService
+from app.services.rag_chat_service import get_rag_chat_service
 
 router = APIRouter()
-chat_service = RAGChatService()
+
+ContextType = Literal["dashboard", "project"]
 
 class ChatQuery(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     query: str
-    context_type: str  # "dashboard" or "project"
+    context_type: ContextType
     project_id: Optional[int] = None
     phase_id: Optional[int] = None
     conversation_history: Optional[List[Dict[str, Any]]] = []
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     response: str
     confidence_score: int
     sources: list
-    context_type: str
+    context_type: ContextType
 
 @router.post("/query", response_model=ChatResponse)
 async def chat_query(
@@ -38,6 +43,7 @@ async def chat_query(
     - Project context: Project-specific guidance
     """
     try:
+        chat_service = get_rag_chat_service()
         response = await chat_service.process_chat_query(
             query=chat_query.query,
             context_type=chat_query.context_type,
@@ -1,81 +1,150 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from app import models
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import and_, bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, undefer
+import orjson
+import time
+from typing import Annotated, List, Dict, Any, Optional, Tuple
+from app import models, schemas
 from app.models_integrations import IntegrationConfig, IntegrationLog
-from app.database import get_db
-from app.services.integration_service import IntegrationService
+from app.database import get_async_db
+from app.services.integration_service import get_integration_service
+from app.services.log_buffer import get_log_buffer
 
-router = APIRouter()
-integration_service = IntegrationService()
+# Log and config listings carry large JSON blobs; encode them with orjson
+# even when the router is mounted on an app without an orjson default
+router = APIRouter(default_response_class=ORJSONResponse)
+DbDep = Annotated[AsyncSession, Depends(get_async_db)]
+integration_service = get_integration_service()
+log_buffer = get_log_buffer()
+
+# Active integration configs by (project_id, integration_type), with expiry times.
+# Per process: other workers may serve a changed config for up to the TTL.
+CONFIG_CACHE_TTL = 60.0
+_config_cache: Dict[Tuple[int, str], Tuple[float, Dict[str, Any]]] = {}
+
+# Hot lookups are built once with bound parameters, so each request reuses
+# the same statement object and its cached compiled SQL
+_ACTIVE_CONFIG_STMT = select(IntegrationConfig.config).where(
+    IntegrationConfig.project_id == bindparam("project_id"),
+    IntegrationConfig.integration_type == bindparam("integration_type"),
+    IntegrationConfig.is_active == True
+)
+
+# Jira config plus the phase to sync; the outer join keeps the config row
+# when the phase is missing. Epics live in phase.data, so no relationship
+# is needed; fail loudly on any lazy load
+_JIRA_SYNC_STMT = (
+    select(IntegrationConfig, models.Phase)
+    .outerjoin(models.Phase, and_(
+        models.Phase.project_id == IntegrationConfig.project_id,
+        models.Phase.id == bindparam("phase_id")
+    ))
+    .options(raiseload("*"), undefer(IntegrationConfig.config))
+    .where(
+        IntegrationConfig.project_id == bindparam("project_id"),
+        IntegrationConfig.integration_type == "jira",
+        IntegrationConfig.is_active == True
+    )
+)
+
+def _invalidate_config(project_id: int, integration_type: str):
+    _config_cache.pop((project_id, integration_type), None)
+
+async def _get_active_config(db: AsyncSession, project_id: int, integration_type: str) -> Optional[Dict[str, Any]]:
+    """Active config dict for a project integration, cached for CONFIG_CACHE_TTL seconds"""
+    key = (project_id, integration_type)
+    entry = _config_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    
+    config = (await db.execute(
+        _ACTIVE_CONFIG_STMT,
+        {"project_id": project_id, "integration_type": integration_type}
+    )).scalars().first()
+    
+    if config is not None:
+        _config_cache[key] = (time.monotonic() + CONFIG_CACHE_TTL, config)
+    return config
+
+async def _upsert_config(db: AsyncSession, project_id: int, integration_type: str, config: Dict[str, Any]):
+    """Insert the project's integration config, or replace and reactivate the existing one"""
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(IntegrationConfig).values(
+        project_id=project_id,
+        integration_type=integration_type,
+        config=config,
+        is_active=True
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["project_id", "integration_type"],
+        set_={"config": stmt.excluded.config, "is_active": True, "updated_at": func.now()}
+    ))
 
 @router.post("/jira/connect")
 async def connect_jira(
     project_id: int,
-    jira_config: Dict[str, Any],
-    db: Session = Depends(get_db)
+    jira_config: schemas.JiraConnectConfig,
+    db: DbDep
 ):
     """
     Connect Jira to a project
     Config should include: url, email, api_token, project_key
     """
+    config = jira_config.model_dump()
+    
     try:
         # Test connection
-        result = await integration_service.test_jira_connection(jira_config)
+        result = await integration_service.test_jira_connection(config)
         
         if result["success"]:
             # Save configuration
-            config = IntegrationConfig(
-                project_id=project_id,
-                integration_type="jira",
-                config=jira_config,
-                is_active=True
-            )
-            db.add(config)
-            db.commit()
+            # A failed upsert only rolls back its savepoint
+            async with db.begin_nested():
+                await _upsert_config(db, project_id, "jira", config)
+            await db.commit()
+            _invalidate_config(project_id, "jira")
             
             # Log the integration
-            log = IntegrationLog(
-                project_id=project_id,
-                integration_type="jira",
-                action="connect",
-                status="success",
-                request_data={"project_id": project_id},
-                response_data=result
-            )
-            db.add(log)
-            db.commit()
+            await log_buffer.put({
+                "project_id": project_id,
+                "integration_type": "jira",
+                "action": "connect",
+                "status": "success",
+                "request_data": {"project_id": project_id},
+                "response_data": result
+            })
             
             return {"message": "Jira connected successfully", "data": result}
         else:
             raise HTTPException(status_code=400, detail=result.get("error", "Connection failed"))
             
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/jira/sync-epics/{project_id}")
 async def sync_jira_epics(
     project_id: int,
     phase_id: int,
-    db: Session = Depends(get_db)
+    db: DbDep
 ):
     """
     Sync epics from TAO SDLC to Jira
     """
     try:
-        # Get integration config
-        config = db.query(IntegrationConfig).filter(
-            IntegrationConfig.project_id == project_id,
-            IntegrationConfig.integration_type == "jira",
-            IntegrationConfig.is_active == True
-        ).first()
+        # Get integration config and phase data in one query
+        row = (await db.execute(
+            _JIRA_SYNC_STMT,
+            {"project_id": project_id, "phase_id": phase_id}
+        )).first()
         
-        if not config:
+        if not row:
             raise HTTPException(status_code=404, detail="Jira integration not configured")
         
-        # Get phase data
-        phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
+        config, phase = row
         if not phase:
             raise HTTPException(status_code=404, detail="Phase not found")
         
@@ -83,212 +152,265 @@ async def sync_jira_epics(
         result = await integration_service.sync_epics_to_jira(config.config, phase.data)
         
         # Log the action
-        log = IntegrationLog(
-            project_id=project_id,
-            integration_type="jira",
-            action="sync_epics",
-            status="success" if result["success"] else "failed",
-            request_data={"phase_id": phase_id},
-            response_data=result
-        )
-        db.add(log)
-        db.commit()
+        await log_buffer.put({
+            "project_id": project_id,
+            "integration_type": "jira",
+            "action": "sync_epics",
+            "status": "success" if result["success"] else "failed",
+            "request_data": {"phase_id": phase_id},
+            "response_data": result
+        })
         
         return result
         
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/github/connect")
 async def connect_github(
     project_id: int,
-    github_config: Dict[str, Any],
-    db: Session = Depends(get_db)
+    github_config: schemas.GithubConnectConfig,
+    db: DbDep
 ):
     """
     Connect GitHub to a project
     Config should include: token, owner, repo
     """
+    config = github_config.model_dump()
+    
     try:
         # Test connection
-        result = await integration_service.test_github_connection(github_config)
+        result = await integration_service.test_github_connection(config)
         
         if result["success"]:
-            config = IntegrationConfig(
-                project_id=project_id,
-                integration_type="github",
-                config=github_config,
-                is_active=True
-            )
-            db.add(config)
-            db.commit()
+            # A failed upsert only rolls back its savepoint
+            async with db.begin_nested():
+                await _upsert_config(db, project_id, "github", config)
+            await db.commit()
+            _invalidate_config(project_id, "github")
             
-            log = IntegrationLog(
-                project_id=project_id,
-                integration_type="github",
-                action="connect",
-                status="success",
-                request_data={"project_id": project_id},
-                response_data=result
-            )
-            db.add(log)
-            db.commit()
+            await log_buffer.put({
+                "project_id": project_id,
+                "integration_type": "github",
+                "action": "connect",
+                "status": "success",
+                "request_data": {"project_id": project_id},
+                "response_data": result
+            })
             
             return {"message": "GitHub connected successfully", "data": result}
         else:
             raise HTTPException(status_code=400, detail=result.get("error", "Connection failed"))
             
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/github/create-repo/{project_id}")
 async def create_github_repo(
     project_id: int,
     repo_config: Dict[str, Any],
-    db: Session = Depends(get_db)
+    db: DbDep
 ):
     """
     Create GitHub repository for the project
     """
     try:
-        config = db.query(IntegrationConfig).filter(
-            IntegrationConfig.project_id == project_id,
-            IntegrationConfig.integration_type == "github",
-            IntegrationConfig.is_active == True
-        ).first()
+        config = await _get_active_config(db, project_id, "github")
         
-        if not config:
+        if config is None:
             raise HTTPException(status_code=404, detail="GitHub integration not configured")
         
-        result = await integration_service.create_github_repo(config.config, repo_config)
+        result = await integration_service.create_github_repo(config, repo_config)
         
-        log = IntegrationLog(
-            project_id=project_id,
-            integration_type="github",
-            action="create_repo",
-            status="success" if result["success"] else "failed",
-            request_data=repo_config,
-            response_data=result
-        )
-        db.add(log)
-        db.commit()
+        await log_buffer.put({
+            "project_id": project_id,
+            "integration_type": "github",
+            "action": "create_repo",
+            "status": "success" if result["success"] else "failed",
+            "request_data": repo_config,
+            "response_data": result
+        })
         
         return result
         
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/confluence/connect")
 async def connect_confluence(
     project_id: int,
-    confluence_config: Dict[str, Any],
-    db: Session = Depends(get_db)
+    confluence_config: schemas.ConfluenceConnectConfig,
+    db: DbDep
 ):
     """
     Connect Confluence to a project
     Config should include: url, email, api_token, space_key
     """
+    config = confluence_config.model_dump()
+    
     try:
-        result = await integration_service.test_confluence_connection(confluence_config)
+        result = await integration_service.test_confluence_connection(config)
         
         if result["success"]:
-            config = IntegrationConfig(
-                project_id=project_id,
-                integration_type="confluence",
-                config=confluence_config,
-                is_active=True
-            )
-            db.add(config)
-            db.commit()
+            # A failed upsert only rolls back its savepoint
+            async with db.begin_nested():
+                await _upsert_config(db, project_id, "confluence", config)
+            await db.commit()
+            _invalidate_config(project_id, "confluence")
+            
+            await log_buffer.put({
+                "project_id": project_id,
+                "integration_type": "confluence",
+                "action": "connect",
+                "status": "success",
+                "request_data": {"project_id": project_id},
+                "response_data": result
+            })
             
             return {"message": "Confluence connected successfully", "data": result}
         else:
             raise HTTPException(status_code=400, detail=result.get("error", "Connection failed"))
             
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/confluence/publish/{project_id}")
 async def publish_to_confluence(
     project_id: int,
     content: Dict[str, Any],
-    db: Session = Depends(get_db)
+    db: DbDep
 ):
     """
     Publish documentation to Confluence
     """
     try:
-        config = db.query(IntegrationConfig).filter(
-            IntegrationConfig.project_id == project_id,
-            IntegrationConfig.integration_type == "confluence",
-            IntegrationConfig.is_active == True
-        ).first()
+        config = await _get_active_config(db, project_id, "confluence")
         
-        if not config:
+        if config is None:
             raise HTTPException(status_code=404, detail="Confluence integration not configured")
         
-        result = await integration_service.publish_to_confluence(config.config, content)
+        result = await integration_service.publish_to_confluence(config, content)
         
-        log = IntegrationLog(
-            project_id=project_id,
-            integration_type="confluence",
-            action="publish_documentation",
-            status="success" if result["success"] else "failed",
-            request_data=content,
-            response_data=result
-        )
-        db.add(log)
-        db.commit()
+        await log_buffer.put({
+            "project_id": project_id,
+            "integration_type": "confluence",
+            "action": "publish_documentation",
+            "status": "success" if result["success"] else "failed",
+            "request_data": content,
+            "response_data": result
+        })
         
         return result
         
-    except Exception as e:
-        db.rollback()
+    except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/logs/{project_id}")
-def get_integration_logs(
+async def get_integration_logs(
     project_id: int,
+    db: DbDep,
     integration_type: str = None,
-    skip: int = 0,
+    after: Optional[int] = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    include_data: bool = False
+):
+    """
+    Get integration logs for a project, newest first
+    
+    Pass the previous page's next_cursor as after to get the next page.
+    request_data/response_data are only included with include_data=true.
+    """
+    query = select(IntegrationLog).where(IntegrationLog.project_id == project_id)
+    
+    if include_data:
+        query = query.options(
+            undefer(IntegrationLog.request_data),
+            undefer(IntegrationLog.response_data)
+        )
+    
+    if integration_type:
+        query = query.where(IntegrationLog.integration_type == integration_type)
+    
+    # Seek past the cursor instead of skipping rows with OFFSET
+    if after is not None:
+        query = query.where(IntegrationLog.id < after)
+    
+    logs = (await db.execute(
+        query.order_by(IntegrationLog.id.desc()).limit(limit)
+    )).scalars().all()
+    
+    return {
+        "logs": logs,
+        "next_cursor": logs[-1].id if logs else None
+    }
+
+@router.get("/logs/{project_id}/stream")
+async def stream_integration_logs(
+    project_id: int,
+    db: DbDep,
+    integration_type: str = None,
+    after: Optional[int] = None,
+    include_data: bool = False
 ):
     """
-    Get integration logs for a project
+    Stream all matching integration logs as NDJSON, newest first
+    
+    Rows are read from a server-side cursor, so memory stays flat however
+    many logs match
     """
-    query = db.query(IntegrationLog).filter(IntegrationLog.project_id == project_id)
+    columns = [
+        IntegrationLog.id,
+        IntegrationLog.project_id,
+        IntegrationLog.integration_type,
+        IntegrationLog.action,
+        IntegrationLog.status,
+        IntegrationLog.error_message,
+        IntegrationLog.created_at
+    ]
+    if include_data:
+        columns += [IntegrationLog.request_data, IntegrationLog.response_data]
+    
+    query = select(*columns).where(IntegrationLog.project_id == project_id)
     
     if integration_type:
-        query = query.filter(IntegrationLog.integration_type == integration_type)
+        query = query.where(IntegrationLog.integration_type == integration_type)
+    
+    if after is not None:
+        query = query.where(IntegrationLog.id < after)
+    
+    result = await db.stream(
+        query.order_by(IntegrationLog.id.desc()).execution_options(yield_per=200)
+    )
+    
+    async def ndjson():
+        async for row in result.mappings():
+            yield orjson.dumps(dict(row)) + b"\n"
     
-    logs = query.order_by(IntegrationLog.created_at.desc()).offset(skip).limit(limit).all()
-    return logs
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @router.get("/config/{project_id}")
-def get_integrations(project_id: int, db: Session = Depends(get_db)):
+async def get_integrations(project_id: int, db: DbDep):
     """
     Get all integration configurations for a project
     """
-    configs = db.query(IntegrationConfig).filter(
-        IntegrationConfig.project_id == project_id
-    ).all()
+    configs = (await db.execute(
+        select(IntegrationConfig)
+        .options(undefer(IntegrationConfig.config))
+        .where(IntegrationConfig.project_id == project_id)
+    )).scalars().all()
     return configs
 
 @router.delete("/config/{config_id}")
-def delete_integration(config_id: int, db: Session = Depends(get_db)):
+async def delete_integration(config_id: int, db: DbDep):
     """
     Delete an integration configuration
     """
-    config = db.query(IntegrationConfig).filter(IntegrationConfig.id == config_id).first()
+    config = await db.get(IntegrationConfig, config_id)
     if not config:
         raise HTTPException(status_code=404, detail="Integration configuration not found")
     
-    db.delete(config)
-    db.commit()
+    await db.delete(config)
+    await db.commit()
+    _invalidate_config(config.project_id, config.integration_type)
     return {"message": "Integration deleted successfully"}
 
@@ -1,57 +1,102 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from typing import Annotated, List, Union
+import logging
 from app import models, schemas
-from app.database import get_db
+from app.database import get_async_db
 
 router = APIRouter()
+DbDep = Annotated[AsyncSession, Depends(get_async_db)]
+logger = logging.getLogger(__name__)
 
-@router.get("/project/{project_id}", response_model=List[schemas.Phase])
-def get_project_phases(project_id: int, db: Session = Depends(get_db)):
-    phases = db.query(models.Phase).filter(
-        models.Phase.project_id == project_id
-    ).order_by(models.Phase.phase_number).all()
+@router.get("/project/{project_id}", response_model=Union[List[schemas.Phase], List[schemas.PhaseSummary]])
+async def get_project_phases(
+    project_id: int,
+    db: DbDep,
+    slim: bool = False
+):
+    # slim=true selects only the summary columns, skipping the phase data blobs
+    if slim:
+        return (await db.execute(
+            select(
+                models.Phase.id,
+                models.Phase.phase_number,
+                models.Phase.phase_name,
+                models.Phase.status
+            )
+            .where(models.Phase.project_id == project_id)
+            .order_by(models.Phase.phase_number)
+        )).all()
+    
+    phases = (await db.execute(
+        select(models.Phase)
+        .options(raiseload("*"))
+        .where(models.Phase.project_id == project_id)
+        .order_by(models.Phase.phase_number)
+    )).scalars().all()
     return phases
 
 @router.get("/{phase_id}", response_model=schemas.Phase)
-def get_phase(phase_id: int, db: Session = Depends(get_db)):
-    phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
+async def get_phase(phase_id: int, db: DbDep):
+    phase = await db.get(models.Phase, phase_id, options=[raiseload("*")])
     if not phase:
         raise HTTPException(status_code=404, detail="Phase not found")
     return phase
 
 @router.put("/{phase_id}", response_model=schemas.Phase)
-def update_phase(
+async def update_phase(
     phase_id: int,
     phase_update: schemas.PhaseUpdate,
-    db: Session = Depends(get_db)
+    db: DbDep
 ):
-    phase = db.query(models.Phase).filter(models.Phase.id == phase_id).first()
-    if not phase:
-        raise HTTPException(status_code=404, detail="Phase not found")
-    
-    # Track if this phase is being approved
-    is_being_approved = phase_update.status == models.PhaseStatus.APPROVED and phase.status != models.PhaseStatus.APPROVED
-    
+    changes = {}
     if phase_update.status:
-        phase.status = phase_update.status
+        changes["status"] = phase_update.status
     if phase_update.data:
-        phase.data = phase_update.data
+        changes["data"] = phase_update.data
     if phase_update.ai_confidence_score is not None:
-        phase.ai_confidence_score = phase_update.ai_confidence_score
+        changes["ai_confidence_score"] = phase_update.ai_confidence_score
+    
+    # Track if this phase is being approved (the only case that needs the current status)
+    is_being_approved = False
+    if phase_update.status == models.PhaseStatus.APPROVED:
+        current_status = (await db.execute(
+            select(models.Phase.status).where(models.Phase.id == phase_id)
+        )).scalar_one_or_none()
+        if current_status is None:
+            raise HTTPException(status_code=404, detail="Phase not found")
+        is_being_approved = current_status != models.PhaseStatus.APPROVED
+    
+    # Apply the changes and read the row back in one UPDATE ... RETURNING
+    if changes:
+        phase = (await db.execute(
+            update(models.Phase)
+            .where(models.Phase.id == phase_id)
+            .values(**changes)
+            .returning(models.Phase)
+        )).scalar_one_or_none()
+    else:
+        phase = await db.get(models.Phase, phase_id)
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
     
     # If this phase is being approved, unlock the next phase
     if is_being_approved:
-        next_phase = db.query(models.Phase).filter(
-            models.Phase.project_id == phase.project_id,
-            models.Phase.phase_number == phase.phase_number + 1
-        ).first()
+        next_phase_number = (await db.execute(
+            update(models.Phase)
+            .where(
+                models.Phase.project_id == phase.project_id,
+                models.Phase.phase_number == phase.phase_number + 1,
+                models.Phase.status == models.PhaseStatus.NOT_STARTED
+            )
+            .values(status=models.PhaseStatus.IN_PROGRESS)
+            .returning(models.Phase.phase_number)
+        )).scalar_one_or_none()
         
-        if next_phase and next_phase.status == models.PhaseStatus.NOT_STARTED:
-            next_phase.status = models.PhaseStatus.IN_PROGRESS
-            print(f"✅ Phase {phase.phase_number} approved, unlocking Phase {next_phase.phase_number}")
+        if next_phase_number is not None:
+            logger.info("Phase %d approved, unlocking Phase %d", phase.phase_number, next_phase_number)
     
-    db.commit()
-    db.refresh(phase)
+    await db.commit()
     return phase
-
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, HttpUrl, SecretStr, field_serializer
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from app.models import PhaseStatus, ApprovalStatus
 
 # User Schemas
@@ -25,11 +25,10 @@ class LoginRequest(BaseModel):
     password: str
 
 class User(UserBase):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 class AuthResponse(BaseModel):
     access_token: str
@@ -46,15 +45,14 @@ class ProjectStakeholderCreate(BaseModel):
     role: str
 
 class Project(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     name: str
     description: str
     current_phase: int
     status: str
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 # Phase Schemas
 class PhaseCreate(BaseModel):
@@ -68,6 +66,8 @@ class PhaseUpdate(BaseModel):
     ai_confidence_score: Optional[int] = None
 
 class Phase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     project_id: int
     phase_number: int
@@ -76,9 +76,14 @@ class Phase(BaseModel):
     data: Dict[str, Any]
     ai_confidence_score: int
     created_at: datetime
+
+class PhaseSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
     
-    class Config:
-        from_attributes = True
+    id: int
+    phase_number: int
+    phase_name: str
+    status: PhaseStatus
 
 # Approval Schemas
 class ApprovalCreate(BaseModel):
@@ -90,15 +95,14 @@ class ApprovalUpdate(BaseModel):
     comments: Optional[str] = None
 
 class Approval(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     phase_id: int
     approver_id: int
     status: ApprovalStatus
     comments: Optional[str]
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 # AI Copilot Schemas
 class AIQuery(BaseModel):
@@ -113,3 +117,71 @@ class AIResponse(BaseModel):
     alternatives: Optional[List[str]] = []
     explanation: Optional[str] = None
 
+# Integration Schemas
+class AtlassianConnectConfig(BaseModel):
+    url: HttpUrl
+    email: EmailStr
+    api_token: SecretStr
+    
+    # The stored config is what the integration service calls the API with,
+    # so dump the real token and a base URL without a trailing slash
+    @field_serializer("url")
+    def serialize_url(self, url: HttpUrl) -> str:
+        return str(url).rstrip("/")
+    
+    @field_serializer("api_token")
+    def serialize_api_token(self, api_token: SecretStr) -> str:
+        return api_token.get_secret_value()
+
+class JiraConnectConfig(AtlassianConnectConfig):
+    project_key: str
+
+class ConfluenceConnectConfig(AtlassianConnectConfig):
+    space_key: str
+
+class GithubConnectConfig(BaseModel):
+    token: SecretStr
+    owner: str
+    repo: Optional[str] = None
+    
+    @field_serializer("token")
+    def serialize_token(self, token: SecretStr) -> str:
+        return token.get_secret_value()
+
+# Generated Planning Schemas
+# Structured-output schemas for epic and user story generation; OpenAI's
+# strict mode needs every field required and no extra keys
+class GeneratedEpic(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
+    id: int
+    title: str
+    description: str
+    stories: int
+    points: int
+    priority: Literal["High", "Medium", "Low"]
+    requirements_mapped: List[str]
+
+class EpicList(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
+    epics: List[GeneratedEpic]
+
+class GeneratedUserStory(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
+    id: int
+    epic: str
+    epic_id: int
+    title: str
+    description: str
+    acceptance_criteria: List[str]
+    points: int
+    priority: Literal["High", "Medium", "Low"]
+    sprint: Optional[int]
+    status: str
+
+class UserStoryList(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
+    stories: List[GeneratedUserStory]
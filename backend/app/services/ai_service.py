@@ -1,20 +1,944 @@
+import asyncio
+import hashlib
+import importlib.util
+import io
 import os
 import json
-from typing import Dict, Any, List
+import logging
+import re
+import time
+from dataclasses import dataclass, replace
+import httpx
+import orjson
+from functools import lru_cache
+from typing import Dict, Any, List, AsyncIterator, Optional, Set, Tuple, Type, Union
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from pydantic import BaseModel
+from app.schemas import EpicList, GeneratedEpic, UserStoryList
+from app.services.frozen import freeze
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Connection pool for each OpenAI client, sized for PRD/BRD/epics/stories
+# generations running side by side
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+
+def _openai_http_client() -> httpx.AsyncClient:
+    """
+    httpx transport speaking HTTP/2, so concurrent requests are multiplexed over
+    one TLS connection; HTTP/1.1 where h2 is not installed (e.g. a bare dev setup)
+    """
+    http2 = importlib.util.find_spec("h2") is not None
+    return DefaultAsyncHttpxClient(limits=OPENAI_HTTP_LIMITS, http2=http2)
+
+# Attempts after the first for 429, 5xx, timeout and connection errors. The SDK
+# backs off exponentially with jitter (0.5s doubling, capped at 8s) and honours
+# Retry-After, so transient failures no longer drop straight to the templates
+OPENAI_MAX_RETRIES = 3
+
+# Shared OpenAI clients by API key
+_clients: Dict[Optional[str], AsyncOpenAI] = {}
+
+def _get_async_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """Shared OpenAI client for an API key, so connections and TLS sessions are reused"""
+    client = _clients.get(api_key)
+    if client is None or client.is_closed():
+        client = _clients[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            http_client=_openai_http_client(),
+            max_retries=OPENAI_MAX_RETRIES
+        )
+    return client
+
+# Generated documents by request hash, so regenerating from unchanged input
+# skips the OpenAI call. Per process and size bounded; oldest entries go first.
+RESPONSE_CACHE_TTL = 3600.0
+RESPONSE_CACHE_MAX_ENTRIES = 256
+_response_cache: Dict[str, Tuple[float, str]] = {}
+
+def _response_cache_key(params: Dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def _cached_response(key: str) -> Optional[str]:
+    entry = _response_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _cache_response(key: str, content: str):
+    if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+        _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, content)
+
+def _gherkin_document_key(filename: str, text: str) -> str:
+    """Cache key for the requirements extracted from one uploaded document"""
+    digest = hashlib.blake2b(text.encode(), digest_size=16, person=b"gherkin").hexdigest()
+    return f"gherkin:{filename}:{digest}"
+
+# Client-side limits for chat completions, so bursts of parallel generations
+# queue here instead of failing with 429s. The bucket adopts the account's
+# real limits from OpenAI's x-ratelimit-* response headers.
+OPENAI_MAX_CONCURRENCY = 20
+OPENAI_RPM = 500
+OPENAI_TPM = 200_000
+
+class _TokenBucket:
+    """Requests and tokens per minute budget, refilled continuously"""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+    
+    async def acquire(self, tokens: int):
+        """Wait until one request and the given number of tokens are available"""
+        async with self._lock:
+            while True:
+                self._refill()
+                # Clamped on every pass: update_from_headers may have lowered tpm
+                # while we slept, and a request above it could never fit
+                needed = min(tokens, self.tpm)
+                if self._requests >= 1 and self._tokens >= needed:
+                    self._requests -= 1
+                    self._tokens -= needed
+                    return
+                await asyncio.sleep(max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (needed - self._tokens) * 60 / self.tpm
+                ))
+    
+    def update_from_headers(self, headers: httpx.Headers):
+        """Adopt the limits and remaining budget OpenAI reports for the account"""
+        def header(name: str) -> Optional[int]:
+            try:
+                return int(headers[name])
+            except (KeyError, ValueError):
+                return None
+        
+        rpm = header("x-ratelimit-limit-requests")
+        tpm = header("x-ratelimit-limit-tokens")
+        remaining_requests = header("x-ratelimit-remaining-requests")
+        remaining_tokens = header("x-ratelimit-remaining-tokens")
+        
+        if rpm:
+            self.rpm = rpm
+        if tpm:
+            self.tpm = tpm
+        if remaining_requests is not None:
+            self._requests = min(self._requests, remaining_requests)
+        if remaining_tokens is not None:
+            self._tokens = min(self._tokens, remaining_tokens)
+
+_SEM = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+_BUCKET = _TokenBucket(rpm=OPENAI_RPM, tpm=OPENAI_TPM)
+
+@lru_cache(maxsize=None)
+def _encoding():
+    """gpt-4o-mini tokenizer, loaded once on first use; None when it cannot be loaded"""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception as e:
+        # Not installed, or its BPE file could not be downloaded
+        logger.warning("tiktoken unavailable, estimating token counts: %s", e)
+        return None
+
+def count_tokens(text: str) -> int:
+    """Token count of text for gpt-4o-mini (about 4 characters a token without tiktoken)"""
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """text cut to at most max_tokens gpt-4o-mini tokens (about 4 characters a token without tiktoken)"""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def _estimate_tokens(params: Dict[str, Any]) -> int:
+    """Token cost of a request for the rate limiter: prompt tokens plus the completion budget"""
+    prompt_tokens = sum(count_tokens(message["content"]) for message in params["messages"])
+    return prompt_tokens + params.get("max_tokens", 0)
+
+def _json_schema_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Strict structured-output response_format for a pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": True}
+    }
+
+# Replies to these are guaranteed to match the schema, so they parse without cleanup
+EPICS_RESPONSE_FORMAT = _json_schema_format(EpicList)
+USER_STORIES_RESPONSE_FORMAT = _json_schema_format(UserStoryList)
+
+# Fields filled in on generated epics and stories that come back without them
+EPIC_DEFAULTS = {
+    'description': "Epic description",
+    'stories': 5,
+    'priority': "Medium",
+    'requirements_mapped': []
+}
+USER_STORY_DEFAULTS = {
+    'epic': "Unknown Epic",
+    'epic_id': 1,
+    'title': "User Story",
+    'description': "Story description",
+    'acceptance_criteria': [],
+    'points': 5,
+    'priority': "Medium",
+    'sprint': None,
+    'status': "backlog"
+}
+GHERKIN_DEFAULTS = {
+    'as_a': "user",
+    'i_want': "to use this feature",
+    'so_that': "I can achieve my goals",
+    'priority': "Medium",
+    'status': "draft"
+}
+RISK_DEFAULTS = {
+    'category': "Technical",
+    'priority': "Medium",
+    'impact': "Medium",
+    'likelihood': "Possible",
+    'mitigation': "To be defined",
+    'contingency': "Monitor and reassess",
+    'affected_requirements': []
+}
+
+def _fill_epic_defaults(epic: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    """Fill in the fields a generated epic came back without"""
+    epic.setdefault('id', idx)
+    epic.setdefault('title', f"Epic {epic['id']}")
+    for key, value in EPIC_DEFAULTS.items():
+        if key not in epic:
+            epic[key] = value.copy() if isinstance(value, list) else value
+    epic.setdefault('points', epic['stories'] * 5)
+    return epic
+
+class _JsonItemScanner:
+    """
+    Incremental scanner over streamed JSON text that returns each object
+    nested at the given depth as soon as its closing brace arrives
+    
+    In {"epics": [{...}, {...}]} the epic objects sit at depth 2.
+    """
+    
+    def __init__(self, depth: int):
+        self.depth = depth
+        self._level = 0
+        self._in_string = False
+        self._escaped = False
+        self._item: List[str] = []
+    
+    def feed(self, text: str) -> List[str]:
+        """Consume the next chunk of text and return the objects it completed"""
+        items = []
+        for char in text:
+            if self._item:
+                self._item.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if char == '{' and self._level == self.depth and not self._item:
+                    self._item.append(char)
+                self._level += 1
+            elif char in '}]':
+                self._level -= 1
+                if self._item and self._level == self.depth:
+                    items.append("".join(self._item))
+                    self._item = []
+        return items
+
+def _format_requirement_prd(idx: int, req: Dict[str, Any]) -> str:
+    """PRD prompt entry for one requirement, with its first two scenarios"""
+    lines = [f"\n{idx}. **{req.get('feature', req.get('title', 'Requirement'))}**\n"]
+    if 'as_a' in req:
+        lines.append(
+            f"   - User Story: As a {req.get('as_a')}, I want {req.get('i_want')}, so that {req.get('so_that')}\n"
+            f"   - Priority: {req.get('priority', 'Medium')}\n"
+            f"   - Status: {req.get('status', 'draft')}\n"
+        )
+    
+    scenarios = req.get('scenarios', [])
+    if scenarios:
+        lines.append(f"   - Scenarios ({len(scenarios)}):\n")
+        for scenario in scenarios[:2]:
+            given = scenario.get('given')
+            when = scenario.get('when')
+            then = scenario.get('then')
+            lines.append(f"     * {scenario.get('title')}\n")
+            if given:
+                lines.append(f"       - Given: {', '.join(given[:2])}\n")
+            if when:
+                lines.append(f"       - When: {', '.join(when[:2])}\n")
+            if then:
+                lines.append(f"       - Then: {', '.join(then[:2])}\n")
+    return "".join(lines)
+
+def _format_requirement_brd(idx: int, req: Dict[str, Any]) -> str:
+    """BRD prompt entry for one requirement, focused on its business value"""
+    entry = f"\n{idx}. **{req.get('feature', req.get('title', 'Requirement'))}**\n"
+    if 'as_a' in req:
+        entry += (
+            f"   - Business Value: {req.get('so_that', 'Business value to be defined')}\n"
+            f"   - Priority: {req.get('priority', 'Medium')}\n"
+        )
+    return entry
+
+# Document text sent for requirement extraction, leaving room in the request for
+# the instructions and the 4000-token completion
+DOCUMENT_MAX_TOKENS = 6000
+
+# Requirement summaries past this size are cut short, keeping the prompt small
+REQUIREMENT_SUMMARY_MAX_TOKENS = 4000
+
+def _join_within_budget(entries: List[str], max_tokens: int) -> str:
+    """Join requirement entries, dropping the trailing ones that would exceed max_tokens"""
+    text = "".join(entries)
+    if count_tokens(text) <= max_tokens:
+        return text
+    
+    kept = []
+    used = 0
+    for entry in entries:
+        used += count_tokens(entry)
+        if used > max_tokens:
+            break
+        kept.append(entry)
+    kept.append(f"\n...({len(entries) - len(kept)} more requirements)\n")
+    return "".join(kept)
+
+def _story_count(epic: Dict[str, Any]) -> int:
+    try:
+        return int(epic.get('stories') or 5)
+    except (TypeError, ValueError):
+        return 5
+
+# Stories are generated in parallel calls of at most this many epics each
+STORIES_GROUP_MAX_EPICS = 3
+STORIES_MAX_TOKENS = 4000
+
+def _stories_max_tokens(epics: List[Dict[str, Any]]) -> int:
+    """Completion budget for the epics' expected stories, at ~200 tokens a story"""
+    return min(STORIES_MAX_TOKENS, 400 + 200 * sum(_story_count(epic) for epic in epics))
+
+def _group_epics(epics: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split epics into groups small enough for one story generation call each"""
+    groups = []
+    group = []
+    expected = 0
+    for epic in epics:
+        count = _story_count(epic)
+        if group and (
+            len(group) == STORIES_GROUP_MAX_EPICS
+            or 400 + 200 * (expected + count) > STORIES_MAX_TOKENS
+        ):
+            groups.append(group)
+            group = []
+            expected = 0
+        group.append(epic)
+        expected += count
+    if group:
+        groups.append(group)
+    return groups
+
+# Epic title keywords that add an optional component to the generated architecture
+ARCHITECTURE_KEYWORDS = {
+    'security': frozenset({'auth', 'login', 'user', 'security'}),
+    'payment': frozenset({'payment', 'billing', 'subscription'}),
+    'notification': frozenset({'notification', 'email', 'alert'}),
+    'analytics': frozenset({'search', 'analytics', 'dashboard'}),
+    'ai': frozenset({'ai', 'ml', 'copilot', 'chatbot'})
+}
+_ARCH_KEYWORDS = sorted(frozenset().union(*ARCHITECTURE_KEYWORDS.values()))
+
+# Fallback scanner for the same keywords: the lookahead finds a match starting at
+# every position, overlapping ones included, like the automaton's overlapping scan
+_ARCH_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _ARCH_KEYWORDS)) + "))")
+
+@lru_cache(maxsize=None)
+def _keyword_automaton():
+    """Aho-Corasick automaton over the architecture keywords; None without ahocorasick_rs"""
+    try:
+        import ahocorasick_rs
+    except ImportError:
+        return None
+    return ahocorasick_rs.AhoCorasick(_ARCH_KEYWORDS)
+
+def _architecture_categories(text: str) -> Set[str]:
+    """Keyword categories whose keywords appear anywhere in text, found in one pass"""
+    automaton = _keyword_automaton()
+    if automaton is None:
+        found = frozenset(_ARCH_KEYWORD_RE.findall(text))
+    else:
+        # Overlapping matches, so "email" also counts its "ai"
+        found = frozenset(automaton.find_matches_as_strings(text, overlapping=True))
+    return {category for category, keywords in ARCHITECTURE_KEYWORDS.items() if not keywords.isdisjoint(found)}
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class _ArchitectureComponent:
+    """One architecture component; orjson serializes the fields in this order"""
+    id: int = 0
+    name: str
+    type: str
+    description: str
+    technologies: Tuple[str, ...]
+
+# Static parts of the generated architecture, serialized with orjson.dumps(..., default=dict)
+_DEFAULT_ARCHITECTURE = freeze({
+    "components": [
+        _ArchitectureComponent(
+            id=1,
+            name="Frontend Application",
+            type="frontend",
+            description="User-facing web application",
+            technologies=("React", "TypeScript", "Tailwind CSS")
+        ),
+        _ArchitectureComponent(
+            id=2,
+            name="Backend API",
+            type="backend",
+            description="RESTful API server",
+            technologies=("Node.js", "Express", "PostgreSQL")
+        )
+    ],
+    "techStack": {
+        "frontend": ["React", "TypeScript", "Tailwind CSS"],
+        "backend": ["Node.js", "Express", "JWT"],
+        "infrastructure": ["Docker", "AWS", "PostgreSQL"]
+    },
+    "database": {},
+    "api": {}
+})
+
+_CORE_COMPONENTS = freeze([
+    _ArchitectureComponent(
+        name="Frontend Application",
+        type="frontend",
+        description="User-facing web application with responsive design",
+        technologies=("React", "TypeScript", "Tailwind CSS", "Vite")
+    ),
+    _ArchitectureComponent(
+        name="Backend API Server",
+        type="backend",
+        description="RESTful API handling business logic and data management",
+        technologies=("FastAPI", "Python", "Pydantic", "SQLAlchemy")
+    ),
+    _ArchitectureComponent(
+        name="PostgreSQL Database",
+        type="database",
+        description="Primary data storage with relational schema",
+        technologies=("PostgreSQL", "pgVector", "Alembic")
+    )
+])
+
+# Component added for each ARCHITECTURE_KEYWORDS category the epic titles mention
+_OPTIONAL_COMPONENTS = freeze({
+    'security': _ArchitectureComponent(
+        name="Authentication Service",
+        type="security",
+        description="User authentication and authorization system",
+        technologies=("JWT", "bcrypt", "OAuth 2.0", "Session Management")
+    ),
+    'payment': _ArchitectureComponent(
+        name="Payment Gateway Integration",
+        type="integration",
+        description="Payment processing and billing management",
+        technologies=("Stripe API", "Webhook Handler", "PCI Compliance")
+    ),
+    'notification': _ArchitectureComponent(
+        name="Notification Service",
+        type="service",
+        description="Email and push notification delivery system",
+        technologies=("SendGrid", "Redis Queue", "WebSocket")
+    ),
+    'analytics': _ArchitectureComponent(
+        name="Analytics & Reporting",
+        type="service",
+        description="Data analytics and reporting engine",
+        technologies=("Elasticsearch", "Grafana", "Pandas")
+    ),
+    'ai': _ArchitectureComponent(
+        name="AI/ML Service",
+        type="service",
+        description="AI-powered features and intelligent automation",
+        technologies=("OpenAI API", "LangChain", "Vector Database", "RAG")
+    )
+})
+
+_TECH_STACK = freeze({
+    "frontend": [
+        "React 18",
+        "TypeScript",
+        "Tailwind CSS",
+        "Vite",
+        "React Router",
+        "Zustand"
+    ],
+    "backend": [
+        "FastAPI",
+        "Python 3.11+",
+        "SQLAlchemy",
+        "Pydantic",
+        "JWT Auth",
+        "CORS Middleware"
+    ],
+    "database": [
+        "PostgreSQL 15+",
+        "Redis (Cache)",
+        "pgVector (AI)",
+        "Alembic (Migrations)"
+    ],
+    "infrastructure": [
+        "Docker",
+        "Docker Compose",
+        "AWS EC2 / DigitalOcean",
+        "Nginx",
+        "GitHub Actions"
+    ],
+    "testing": [
+        "Pytest",
+        "Jest",
+        "React Testing Library",
+        "Playwright"
+    ]
+})
+
+_DATABASE_SCHEMA = freeze({
+    "tables": [
+        {
+            "name": "users",
+            "description": "User accounts and authentication",
+            "key_fields": ["id", "email", "username", "password_hash", "role"]
+        },
+        {
+            "name": "projects",
+            "description": "Project information",
+            "key_fields": ["id", "name", "description", "created_by", "status"]
+        },
+        {
+            "name": "phases",
+            "description": "SDLC phases per project",
+            "key_fields": ["id", "project_id", "phase_number", "status", "data"]
+        }
+    ]
+})
+
+_API_DESIGN = freeze({
+    "restful_endpoints": [
+        {"method": "POST", "path": "/api/auth/login", "description": "User authentication"},
+        {"method": "GET", "path": "/api/projects", "description": "List all projects"},
+        {"method": "POST", "path": "/api/projects", "description": "Create new project"},
+        {"method": "GET", "path": "/api/projects/{id}", "description": "Get project details"},
+        {"method": "GET", "path": "/api/projects/{id}/phases", "description": "Get project phases"}
+    ],
+    "authentication": "JWT Bearer Token",
+    "data_format": "JSON",
+    "versioning": "URL path (/api/v1/...)"
+})
+
+# Description keywords that add two points to a template story estimate,
+# matched anywhere in the text in one case-insensitive scan
+STORY_COMPLEXITY_KEYWORDS = ('integrate', 'api', 'payment', 'security', 'authentication', 'sync', 'complex')
+_COMPLEXITY_RE = re.compile("|".join(map(re.escape, STORY_COMPLEXITY_KEYWORDS)), re.IGNORECASE)
+
+# Opening ```/```json and closing ``` fences around a JSON reply
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+# Batch API states after which a batch will not change again
+BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Requirement extraction prompt; filled with the document name and (truncated) text
+_GHERKIN_PROMPT_TEMPLATE = """You are an expert Business Analyst and Requirements Engineer. Analyze the following document and extract ALL requirements in proper Gherkin format.
+
+**Document**: {filename}
+
+**Content**:
+{text}  
+
+**Your Task**:
+1. **READ** the entire document carefully
+2. **ANALYZE** and identify all functional and non-functional requirements
+3. **SUMMARIZE** each requirement clearly
+4. **EXTRACT** requirements and convert to proper Gherkin format
+5. **PRIORITIZE** each requirement (Critical/High/Medium/Low) based on:
+   - Business impact
+   - User value
+   - Technical complexity
+   - Dependencies
+
+**Instructions**:
+- Extract EVERY requirement mentioned in the document
+- For each requirement, create:
+  * Clear Feature name
+  * User story in format: "As a [role], I want [goal], so that [benefit]"
+  * Multiple realistic scenarios with Given-When-Then
+  * Priority based on importance indicators in document
+  * Status as "draft"
+- Include:
+  * Functional requirements (what the system should do)
+  * User interactions
+  * Business rules
+  * Data requirements
+  * Integration needs
+  * Security requirements
+  * Performance requirements
+- Make scenarios specific and testable
+- Use actual details from the document, not generic placeholders
+
+**Output Format** (JSON object):
+{{
+  "requirements": [
+    {{
+      "id": "req-1",
+      "feature": "Specific Feature Name from Document",
+      "as_a": "specific user role from document",
+      "i_want": "specific goal from document",
+      "so_that": "specific benefit from document",
+      "scenarios": [
+        {{
+          "title": "Specific scenario from document",
+          "given": ["specific precondition 1", "specific precondition 2"],
+          "when": ["specific action 1", "specific action 2"],
+          "then": ["specific expected result 1", "specific expected result 2"]
+        }}
+      ],
+      "priority": "Critical|High|Medium|Low",
+      "status": "draft",
+      "notes": "Any important notes or clarifications from document"
+    }}
+  ]
+}}
+
+Return ONLY the JSON object with ALL extracted requirements. Be thorough and extract everything mentioned in the document."""
+
+# PRD prompt for requirements extracted from documents
+_PRD_FROM_REQUIREMENTS_PROMPT_TEMPLATE = """You are an expert Product Manager. Generate a comprehensive Product Requirements Document (PRD) based on the following extracted requirements.
+
+**Project**: {project_name}
+
+**Extracted Requirements**:
+{req_summary}
+
+**Instructions**:
+Generate a complete, professional PRD following industry best practices with these sections:
+
+1. **Executive Summary**: Overview and objectives
+2. **Product Overview**: What is being built and why
+3. **Target Users**: Who will use this product
+4. **User Personas**: 2-3 detailed personas based on requirements
+5. **Feature Requirements**: Detailed breakdown of each feature from extracted requirements
+   - Use the actual requirement details
+   - Include user stories
+   - Add acceptance criteria from scenarios
+6. **Functional Requirements**: System capabilities
+7. **Non-Functional Requirements**: Performance, security, scalability
+8. **User Experience**: UI/UX considerations
+9. **Technical Considerations**: Tech stack suggestions
+10. **Success Metrics**: KPIs and measurement criteria
+11. **Timeline & Phases**: Suggested development phases
+12. **Risks & Mitigations**: Potential challenges
+
+**Format**: Markdown with proper headings, lists, and formatting
+**Style**: Professional, clear, actionable
+**Length**: Comprehensive (2000-3000 words)
+
+Use the ACTUAL requirement details provided above. Do not use generic placeholders. Make it specific to the extracted requirements.
+
+Return the complete PRD document in markdown format."""
+
+# BRD prompt for requirements extracted from documents
+_BRD_FROM_REQUIREMENTS_PROMPT_TEMPLATE = """You are an expert Business Analyst. Generate a comprehensive Business Requirements Document (BRD) based on the following extracted requirements.
+
+**Project**: {project_name}
+
+**Extracted Requirements**:
+{req_summary}
+
+**Instructions**:
+Generate a complete, professional BRD following industry best practices with these sections:
+
+1. **Executive Summary**: Business case and objectives
+2. **Business Context**: Industry, market, and competitive landscape
+3. **Business Objectives**: Clear, measurable goals (SMART)
+4. **Stakeholders**: Key stakeholders and their interests
+5. **Scope**: In-scope and out-of-scope items based on requirements
+6. **Business Requirements**: High-level business needs
+   - Use the actual extracted requirements
+   - Group by business capability
+   - Link to business value
+7. **Functional Requirements**: Detailed functionality needed
+8. **Business Rules**: Rules and constraints
+9. **Assumptions & Dependencies**: What we're assuming, what we depend on
+10. **Success Criteria**: How we measure success
+11. **Timeline & Budget**: High-level estimates
+12. **Risk Analysis**: Business risks and mitigation strategies
+13. **Approval & Sign-off**: Stakeholder approval process
+
+**Format**: Markdown with proper headings, tables, and formatting
+**Style**: Business-focused, strategic, clear
+**Length**: Comprehensive (2000-3000 words)
+
+Use the ACTUAL requirement details provided above. Focus on BUSINESS VALUE and strategic alignment. Make it specific to the extracted requirements.
+
+Return the complete BRD document in markdown format."""
+
+# Risk analysis prompt for extracted requirements
+_RISK_PROMPT_TEMPLATE = """You are an expert Risk Analyst and Project Manager. Analyze the following requirements and identify potential risks for this project.
+
+**Project**: {project_name}
+
+**Requirements**:
+{req_summary}
+
+**Instructions**:
+Analyze these requirements and identify risks in the following categories:
+1. **Technical Risks**: Technology challenges, integration issues, performance concerns
+2. **Business Risks**: Market changes, stakeholder alignment, ROI concerns
+3. **Resource Risks**: Team availability, skills gaps, dependencies
+4. **Schedule Risks**: Timeline pressures, dependencies, scope creep
+5. **Quality Risks**: Testing challenges, complexity, technical debt
+
+For each risk, provide:
+- **Risk Name**: Clear, specific risk description
+- **Category**: Technical/Business/Resource/Schedule/Quality
+- **Priority**: Critical/High/Medium/Low (based on likelihood × impact)
+- **Impact**: Severe/High/Medium/Low
+- **Likelihood**: Very Likely/Likely/Possible/Unlikely
+- **Mitigation**: Specific mitigation strategy
+- **Contingency**: What to do if risk occurs
+
+**Priority Calculation**:
+- Critical: High likelihood + High/Severe impact
+- High: Medium/High likelihood + Medium/High impact
+- Medium: Low/Medium likelihood + Medium impact
+- Low: Low likelihood + Low impact
+
+**Output Format** (JSON object):
+{{
+  "risks": [
+    {{
+      "id": "risk-1",
+      "risk": "Specific risk description",
+      "category": "Technical|Business|Resource|Schedule|Quality",
+      "priority": "Critical|High|Medium|Low",
+      "impact": "Severe|High|Medium|Low",
+      "likelihood": "Very Likely|Likely|Possible|Unlikely",
+      "mitigation": "Specific mitigation strategy",
+      "contingency": "Plan if risk occurs",
+      "affected_requirements": ["req-1", "req-2"]
+    }}
+  ]
+}}
+
+Identify 5-10 most significant risks. Be specific to the actual requirements provided. Focus on realistic, actionable risks.
+
+Return ONLY the JSON object."""
+
 class AIService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = AsyncOpenAI(api_key=self.api_key)
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        return _get_async_client(self.api_key)
+    
+    async def close(self):
+        """Close the shared OpenAI client's connection pool (called from the app lifespan)"""
+        client = _clients.pop(self.api_key, None)
+        if client is not None:
+            await client.close()
+        
+    async def _complete(self, **params) -> Tuple[str, str]:
+        """
+        Text of a chat completion and its response cache key
+        
+        An exact repeat of a cached request (same model, messages and sampling
+        settings) is answered from the cache. Callers store the text with
+        _cache_response once it has passed their own checks.
+        """
+        key = _response_cache_key(params)
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached, key
+        
+        async with _SEM:
+            await _BUCKET.acquire(_estimate_tokens(params))
+            raw = await self.client.chat.completions.with_raw_response.create(**params)
+        _BUCKET.update_from_headers(raw.headers)
+        response = raw.parse()
+        return response.choices[0].message.content.strip(), key
+    
+    async def _stream_text(self, **params) -> Tuple[str, str]:
+        """
+        Text of a chat completion, read from a stream as it is generated,
+        and its response cache key
+        
+        Long completions arrive token by token instead of as one response
+        at the end, so the connection never sits idle behind a read timeout.
+        Shares the response cache with _complete: the key covers the model,
+        sampling settings and the prompt with its embedded document or
+        requirements, so unchanged input is answered from the cache.
+        """
+        key = _response_cache_key(params)
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached, key
+        
+        buffer = io.StringIO()
+        async with _SEM:
+            await _BUCKET.acquire(_estimate_tokens(params))
+            raw = await self.client.chat.completions.with_raw_response.create(**params, stream=True)
+            _BUCKET.update_from_headers(raw.headers)
+            async for chunk in raw.parse():
+                if chunk.choices and chunk.choices[0].delta.content:
+                    buffer.write(chunk.choices[0].delta.content)
+        return buffer.getvalue().strip(), key
+    
+    async def _stream_completion(self, params: Dict[str, Any], fallback: str) -> AsyncIterator[str]:
+        """
+        Stream a document completion chunk by chunk, caching the full text
         
-    async def process_query(self, query: str, phase_name: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        Shares the response cache with _complete; a cached document is sent as
+        one chunk. If OpenAI fails before anything was sent, the fallback
+        document is sent instead.
+        """
+        key = _response_cache_key(params)
+        cached = _cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            # The concurrency slot is held until the stream has been read
+            async with _SEM:
+                await _BUCKET.acquire(_estimate_tokens(params))
+                raw = await self.client.chat.completions.with_raw_response.create(**params, stream=True)
+                _BUCKET.update_from_headers(raw.headers)
+                async for chunk in raw.parse():
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.warning("OpenAI streaming generation failed: %s", e)
+            if not parts:
+                yield fallback
+            return
+        
+        _cache_response(key, "".join(parts).strip())
+    
+    async def stream_document(self, content_type: str, data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Generate a PRD or BRD as an async iterator of text chunks
+        """
+        generators = {"prd": self._generate_prd, "brd": self._generate_brd}
+        document = await generators[content_type](data, stream=True)
+        
+        # Without requirements the generators return a template string
+        if isinstance(document, str):
+            yield document
+            return
+        async for chunk in document:
+            yield chunk
+    
+    async def _stream_epics(self, params: Dict[str, Any], fallback: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream generated epics, each one as soon as its JSON object is complete
+        
+        Shares the response cache with _complete. If OpenAI fails before any
+        epic was sent, the fallback epics are sent instead.
+        """
+        key = _response_cache_key(params)
+        cached = _cached_response(key)
+        if cached is not None:
+            for idx, item in enumerate(EpicList.model_validate_json(cached).epics, 1):
+                yield _fill_epic_defaults(item.model_dump(), idx)
+            return
+        
+        parts = []
+        scanner = _JsonItemScanner(depth=2)
+        sent = 0
+        try:
+            # The concurrency slot is held until the stream has been read
+            async with _SEM:
+                await _BUCKET.acquire(_estimate_tokens(params))
+                raw = await self.client.chat.completions.with_raw_response.create(**params, stream=True)
+                _BUCKET.update_from_headers(raw.headers)
+                async for chunk in raw.parse():
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        for item in scanner.feed(chunk.choices[0].delta.content):
+                            sent += 1
+                            yield _fill_epic_defaults(GeneratedEpic.model_validate_json(item).model_dump(), sent)
+        except Exception as e:
+            logger.warning("OpenAI epic streaming failed: %s", e)
+            if not sent:
+                for epic in fallback:
+                    yield epic
+            return
+        
+        content = "".join(parts).strip()
+        try:
+            epics = EpicList.model_validate_json(content).epics
+        except ValueError:
+            epics = []
+        if epics:
+            # Only a response that parsed and validated is worth reusing
+            _cache_response(key, content)
+        elif not sent:
+            for epic in fallback:
+                yield epic
+    
+    async def stream_epics(self, data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate epics as an async iterator, yielding each epic once it is complete
+        """
+        epics = await self._generate_epics(data, stream=True)
+        
+        # Without requirements _generate_epics returns the generic epics directly
+        if isinstance(epics, list):
+            for epic in epics:
+                yield epic
+            return
+        async for epic in epics:
+            yield epic
+    
+    async def process_query(self, query: str, phase_name: str, context: Dict[str, Any], stream: bool = False):
         """
         Process user query with AI assistance
+        
+        With stream=True, returns an async iterator of response text chunks instead
         """
+        if stream:
+            return self._stream_query(query, phase_name, context)
+        
         # Mock response for now - integrate with actual LLM in production
         return {
             "response": f"AI response for '{query}' in phase '{phase_name}'. Context: {context}",
@@ -26,16 +950,58 @@ class AIService:
             "explanation": "This is the recommended approach based on best practices."
         }
     
-    async def generate_content(self, phase_name: str, content_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _stream_query(self, query: str, phase_name: str, context: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream a query answer from OpenAI chunk by chunk
+        """
+        params = {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": f"You are an SDLC assistant helping with the {phase_name} phase of a software project. Context: {json.dumps(context or {})}"},
+                {"role": "user", "content": query}
+            ],
+            "temperature": 0.5,
+            "max_tokens": 1500
+        }
+        try:
+            # The concurrency slot is held until the stream has been read
+            async with _SEM:
+                await _BUCKET.acquire(_estimate_tokens(params))
+                raw = await self.client.chat.completions.with_raw_response.create(**params, stream=True)
+                _BUCKET.update_from_headers(raw.headers)
+                async for chunk in raw.parse():
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.warning("OpenAI streaming query failed: %s", e)
+            yield f"AI response for '{query}' in phase '{phase_name}'. Context: {context}"
+    
+    async def generate_content(self, phase_name: str, content_type: str, data: Dict[str, Any], batch: bool = False) -> Dict[str, Any]:
         """
         Generate phase-specific content
+        
+        With batch=True, PRD/BRD generation is submitted to the OpenAI Batch API
+        (half the cost, results within 24h) and the batch id is returned instead;
+        collect the documents later with get_batch_results
         """
+        if batch and content_type in ("prd", "brd", "prd_brd"):
+            generators = {"prd": self._generate_prd, "brd": self._generate_brd}
+            kinds = ["prd", "brd"] if content_type == "prd_brd" else [content_type]
+            jobs = {kind: await generators[kind](data, batch=True) for kind in kinds}
+            
+            # Without requirements the generators return templates; nothing to batch
+            if not any(isinstance(request, str) for request in jobs.values()):
+                return await self.submit_batch(jobs)
+        
         # Generate content based on phase and type
         if "Requirements" in phase_name:
             if content_type == "prd":
                 content = await self._generate_prd(data)
             elif content_type == "brd":
                 content = await self._generate_brd(data)
+            elif content_type == "prd_brd":
+                content = await self.generate_bundle(data)
             elif content_type == "requirements":
                 content = self._generate_requirements(data)
             else:
@@ -60,45 +1026,102 @@ class AIService:
             "confidence_score": 85
         }
     
-    async def _generate_prd(self, data: Dict[str, Any]) -> str:
+    async def submit_batch(self, jobs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Submit chat completion requests (custom_id -> request params) as one Batch API job
+        """
+        lines = [
+            orjson.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": params})
+            for custom_id, params in jobs.items()
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %d request(s)", batch.id, len(jobs))
+        return {"batch_id": batch.id, "status": batch.status}
+    
+    async def get_batch_results(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Status of a submitted batch, plus the generated text by custom_id once it has completed
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        result = {"batch_id": batch.id, "status": batch.status}
+        
+        if batch.status == "completed" and batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            results = {}
+            for line in output.content.splitlines():
+                row = orjson.loads(line)
+                response = row.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[row["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+                else:
+                    # Failed requests are reported as None rather than failing the batch
+                    results[row["custom_id"]] = None
+            result["results"] = results
+        
+        return result
+    
+    async def wait_for_batch(self, batch_id: str, poll_interval: float = 60.0) -> Dict[str, Any]:
+        """
+        Poll a batch until it finishes, for offline jobs that can wait for the results
+        """
+        while True:
+            result = await self.get_batch_results(batch_id)
+            if result["status"] in BATCH_FINAL_STATUSES:
+                return result
+            await asyncio.sleep(poll_interval)
+    
+    async def generate_bundle(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate the PRD and BRD concurrently, so the wait is the slower of the two
+        """
+        # return_exceptions lets both calls finish before an error is raised
+        prd, brd = await asyncio.gather(
+            self._generate_prd(data),
+            self._generate_brd(data),
+            return_exceptions=True
+        )
+        for result in (prd, brd):
+            if isinstance(result, BaseException):
+                raise result
+        return {"prd": prd, "brd": brd}
+    
+    async def _generate_prd(self, data: Dict[str, Any], stream: bool = False, batch: bool = False) -> Union[str, AsyncIterator[str], Dict[str, Any]]:
         """
         Generate Product Requirements Document using OpenAI based on collected requirements.
         Uses proper template structure and dynamically fills with analyzed requirement data.
+        
+        With stream=True, returns an async iterator of text chunks instead, and
+        with batch=True the chat completion request params for the Batch API
         """
         # Extract requirements from data
         requirements = data.get('requirements', [])
         gherkin_reqs = data.get('gherkinRequirements', [])
         project_info = data.get('project', {})
         
-        print(f"[INFO] Generating PRD using OpenAI for project: {project_info.get('name', 'Project')}")
+        logger.info("Generating PRD using OpenAI for project: %s", project_info.get('name', 'Project'))
         
         # Prepare requirements summary for OpenAI
-        req_summary = ""
         all_reqs = gherkin_reqs or requirements
-        
-        for idx, req in enumerate(all_reqs, 1):
-            if isinstance(req, dict):
-                req_summary += f"\n{idx}. **{req.get('feature', req.get('title', 'Requirement'))}**\n"
-                if 'as_a' in req:
-                    req_summary += f"   - User Story: As a {req.get('as_a')}, I want {req.get('i_want')}, so that {req.get('so_that')}\n"
-                    req_summary += f"   - Priority: {req.get('priority', 'Medium')}\n"
-                    req_summary += f"   - Status: {req.get('status', 'draft')}\n"
-                    
-                scenarios = req.get('scenarios', [])
-                if scenarios:
-                        req_summary += f"   - Scenarios ({len(scenarios)}):\n"
-                        for scenario in scenarios[:2]:  # First 2 scenarios
-                            req_summary += f"     * {scenario.get('title')}\n"
-                            if scenario.get('given'):
-                                req_summary += f"       - Given: {', '.join(scenario.get('given')[:2])}\n"
-                            if scenario.get('when'):
-                                req_summary += f"       - When: {', '.join(scenario.get('when')[:2])}\n"
-                            if scenario.get('then'):
-                                req_summary += f"       - Then: {', '.join(scenario.get('then')[:2])}\n"
+        req_summary = _join_within_budget(
+            [
+                _format_requirement_prd(idx, req)
+                for idx, req in enumerate(all_reqs, 1)
+                if isinstance(req, dict)
+            ],
+            REQUIREMENT_SUMMARY_MAX_TOKENS
+        )
         
         if not req_summary:
             # Fallback to basic PRD if no requirements
-            print("[WARNING] No requirements found, generating basic PRD template")
+            logger.warning("No requirements found, generating basic PRD template")
             return f"""# Product Requirements Document (PRD)
 
 ## Project: {project_info.get('name', 'Project')}
@@ -115,13 +1138,9 @@ No requirements have been collected yet. Please complete Phase 1 (Requirements G
 *Generated by TAO SDLC AI Copilot*"""
         
         # Create OpenAI prompt for intelligent PRD generation (optimized for speed)
-        prompt = f"""Generate a professional Product Requirements Document (PRD) for this project.
-
-**Project**: {project_info.get('name', 'Project')}
-**Description**: {project_info.get('description', 'Software project')}
-
-**Requirements**:
-{req_summary}
+        # Static instructions go first and project data last, so requests share a
+        # prefix that OpenAI's prompt cache (routed by prompt_cache_key) can reuse
+        prompt = f"""Generate a professional Product Requirements Document (PRD) for the project described below.
 
 **Include these sections with ACTUAL data from requirements**:
 1. Executive Summary (2-3 paragraphs - purpose, objectives, value)
@@ -140,34 +1159,50 @@ No requirements have been collected yet. Please complete Phase 1 (Requirements G
 
 **Format**: Professional markdown, clear headings, bullet lists, tables. 2000-2500 words. Use ACTUAL requirement data, NOT placeholders.
 
+**Project**: {project_info.get('name', 'Project')}
+**Description**: {project_info.get('description', 'Software project')}
+
+**Requirements**:
+{req_summary}
+
 Return complete PRD."""
 
+        params = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert Product Manager who creates comprehensive, professional PRDs. Use proper templates and fill with actual requirement data."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=3000,  # Optimized for faster response
+            prompt_cache_key="tao-prd-v1"
+        )
+        
+        if batch:
+            return params
+        if stream:
+            return self._stream_completion(params, self._generate_fallback_prd(project_info, all_reqs))
+        
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert Product Manager who creates comprehensive, professional PRDs. Use proper templates and fill with actual requirement data."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=3000  # Optimized for faster response
-            )
+            prd_content, cache_key = await self._complete(**params)
             
-            prd_content = response.choices[0].message.content.strip()
-            print(f"[OK] PRD generated using OpenAI ({len(prd_content)} characters)")
+            _cache_response(cache_key, prd_content)
+            logger.info("PRD generated using OpenAI (%d characters)", len(prd_content))
             return prd_content
             
         except Exception as e:
-            print(f"[WARNING] OpenAI PRD generation failed: {str(e)}")
-            print("Falling back to template-based PRD")
+            logger.warning("OpenAI PRD generation failed, falling back to template-based PRD: %s", e)
             
             # Fallback: Generate basic template-based PRD
             return self._generate_fallback_prd(project_info, all_reqs)
 
-    async def _generate_brd(self, data: Dict[str, Any]) -> str:
+    async def _generate_brd(self, data: Dict[str, Any], stream: bool = False, batch: bool = False) -> Union[str, AsyncIterator[str], Dict[str, Any]]:
         """
         Generate Business Requirements Document using OpenAI based on collected requirements.
         Uses proper template structure and dynamically fills with analyzed requirement data.
+        
+        With stream=True, returns an async iterator of text chunks instead, and
+        with batch=True the chat completion request params for the Batch API
         """
         # Extract requirements and project info
         requirements = data.get('requirements', [])
@@ -175,22 +1210,22 @@ Return complete PRD."""
         project_info = data.get('project', {})
         risks = data.get('risks', [])
         
-        print(f"[INFO] Generating BRD using OpenAI for project: {project_info.get('name', 'Project')}")
+        logger.info("Generating BRD using OpenAI for project: %s", project_info.get('name', 'Project'))
         
         # Prepare requirements summary for OpenAI
-        req_summary = ""
         all_reqs = gherkin_reqs or requirements
-        
-        for idx, req in enumerate(all_reqs, 1):
-            if isinstance(req, dict):
-                req_summary += f"\n{idx}. **{req.get('feature', req.get('title', 'Requirement'))}**\n"
-                if 'as_a' in req:
-                    req_summary += f"   - Business Value: {req.get('so_that', 'Business value to be defined')}\n"
-                    req_summary += f"   - Priority: {req.get('priority', 'Medium')}\n"
+        req_summary = _join_within_budget(
+            [
+                _format_requirement_brd(idx, req)
+                for idx, req in enumerate(all_reqs, 1)
+                if isinstance(req, dict)
+            ],
+            REQUIREMENT_SUMMARY_MAX_TOKENS
+        )
         
         if not req_summary:
             # Fallback to basic BRD if no requirements
-            print("[WARNING] No requirements found, generating basic BRD template")
+            logger.warning("No requirements found, generating basic BRD template")
             return f"""# Business Requirements Document (BRD)
 
 ## Project: {project_info.get('name', 'Project')}
@@ -207,13 +1242,7 @@ No requirements have been collected yet. Please complete Phase 1 (Requirements G
 *Generated by TAO SDLC AI Copilot*"""
         
         # Create OpenAI prompt for intelligent BRD generation (optimized for speed)
-        prompt = f"""Generate a professional Business Requirements Document (BRD) for this project.
-
-**Project**: {project_info.get('name', 'Project')}
-**Description**: {project_info.get('description', 'Business initiative')}
-
-**Requirements**:
-{req_summary}
+        prompt = f"""Generate a professional Business Requirements Document (BRD) for the project described below.
 
 **Include these sections with ACTUAL data from requirements**:
 1. Executive Summary (2-3 paragraphs - business case, benefits, objectives)
@@ -229,26 +1258,39 @@ No requirements have been collected yet. Please complete Phase 1 (Requirements G
 
 **Format**: Professional markdown, 1500-2000 words, focus on BUSINESS VALUE. Use ACTUAL requirement data, NOT placeholders.
 
+**Project**: {project_info.get('name', 'Project')}
+**Description**: {project_info.get('description', 'Business initiative')}
+
+**Requirements**:
+{req_summary}
+
 Return complete BRD."""
 
+        params = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert Business Analyst who creates professional BRDs focused on business value."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=2200,  # Optimized for faster response
+            prompt_cache_key="tao-brd-v1"
+        )
+        
+        if batch:
+            return params
+        if stream:
+            return self._stream_completion(params, self._generate_fallback_brd(project_info, all_reqs))
+        
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert Business Analyst who creates professional BRDs focused on business value."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=2200  # Optimized for faster response
-            )
+            brd_content, cache_key = await self._complete(**params)
             
-            brd_content = response.choices[0].message.content.strip()
-            print(f"[OK] BRD generated using OpenAI ({len(brd_content)} characters)")
+            _cache_response(cache_key, brd_content)
+            logger.info("BRD generated using OpenAI (%d characters)", len(brd_content))
             return brd_content
             
         except Exception as e:
-            print(f"[WARNING] OpenAI BRD generation failed: {str(e)}")
-            print("Falling back to template-based BRD")
+            logger.warning("OpenAI BRD generation failed, falling back to template-based BRD: %s", e)
             
             # Fallback: Generate basic template-based BRD
             return self._generate_fallback_brd(project_info, all_reqs)
@@ -288,11 +1330,12 @@ Return complete BRD."""
             }
         ]
     
-    async def _generate_epics(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _generate_epics(self, data: Dict[str, Any], stream: bool = False) -> Union[List[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]:
         """
         Generate epics based on Phase 1 requirements, PRD, and BRD using OpenAI
         
-        Intelligently analyzes requirements and groups them into high-level epics
+        Intelligently analyzes requirements and groups them into high-level epics.
+        With stream=True, returns an async iterator of epics instead.
         """
         requirements = data.get('requirements', [])
         gherkin_reqs = data.get('gherkinRequirements', [])
@@ -315,26 +1358,27 @@ Return complete BRD."""
             ]
         
         # Prepare requirements context for OpenAI
-        requirements_context = ""
+        context_parts = []
         
         if gherkin_reqs:
-            requirements_context += "\n### Gherkin Requirements:\n"
+            context_parts.append("\n### Gherkin Requirements:\n")
             for idx, req in enumerate(gherkin_reqs, 1):
-                requirements_context += f"\n{idx}. **{req.get('feature', 'Feature')}** (ID: {req.get('id', '')})\n"
-                requirements_context += f"   - As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n"
-                requirements_context += f"   - So that {req.get('so_that', '')}\n"
-                requirements_context += f"   - Priority: {req.get('priority', 'Medium')}\n"
+                context_parts.append(f"\n{idx}. **{req.get('feature', 'Feature')}** (ID: {req.get('id', '')})\n")
+                context_parts.append(f"   - As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n")
+                context_parts.append(f"   - So that {req.get('so_that', '')}\n")
+                context_parts.append(f"   - Priority: {req.get('priority', 'Medium')}\n")
                 
                 scenarios = req.get('scenarios', [])
                 if scenarios:
-                    requirements_context += f"   - Scenarios: {len(scenarios)}\n"
+                    context_parts.append(f"   - Scenarios: {len(scenarios)}\n")
                     for scenario in scenarios[:2]:  # Include first 2 scenarios as examples
-                        requirements_context += f"     * {scenario.get('title', '')}\n"
+                        context_parts.append(f"     * {scenario.get('title', '')}\n")
         
         if requirements:
-            requirements_context += "\n### Legacy Requirements:\n"
+            context_parts.append("\n### Legacy Requirements:\n")
             for idx, req in enumerate(requirements, 1):
-                requirements_context += f"{idx}. {req.get('title', 'Requirement')} (Priority: {req.get('priority', 'Medium')})\n"
+                context_parts.append(f"{idx}. {req.get('title', 'Requirement')} (Priority: {req.get('priority', 'Medium')})\n")
+        requirements_context = "".join(context_parts)
         
         # Extract key sections from PRD and BRD for context
         prd_summary = ""
@@ -347,8 +1391,35 @@ Return complete BRD."""
             # Extract first 2000 characters of BRD for context
             brd_summary = brd[:2000] + "..."
         
+        # Room for 3-6 epics, whose mapped requirement ids grow with the requirement count
+        max_tokens = min(2000, 1000 + 50 * (len(gherkin_reqs) + len(requirements)))
+        
         # Create prompt for OpenAI to generate epics
-        prompt = f"""You are an expert Product Manager and Agile Coach. Analyze the following requirements from Phase 1 (Requirements Gathering) and generate a comprehensive set of Epics for Phase 2 (Planning & Backlog).
+        prompt = f"""You are an expert Product Manager and Agile Coach. Analyze the requirements from Phase 1 (Requirements Gathering) and generate a comprehensive set of Epics for Phase 2 (Planning & Backlog).
+
+**Instructions**:
+1. Analyze all the requirements, PRD, and BRD provided below
+2. Group related requirements into logical, high-level Epics (typically 3-6 epics)
+3. Each epic should represent a major feature area or business capability
+4. Ensure EVERY requirement is mapped to an epic (use the requirement IDs)
+5. Estimate the number of user stories (2-10) and story points (10-50) for each epic based on complexity
+6. Assign priority based on business value: High, Medium, or Low
+7. Create meaningful titles and descriptions that reflect the actual requirements
+
+**Output Format** (JSON object):
+{{
+  "epics": [
+    {{
+      "id": 1,
+      "title": "Epic Name",
+      "description": "Detailed description of what this epic covers",
+      "stories": 5,
+      "points": 25,
+      "priority": "High",
+      "requirements_mapped": ["req-id-1", "req-id-2"]
+    }}
+  ]
+}}
 
 **Project**: {project_info.get('name', 'Software Project')}
 
@@ -360,185 +1431,93 @@ Return complete BRD."""
 
 {requirements_context}
 
-**Instructions**:
-1. Analyze all the requirements, PRD, and BRD provided above
-2. Group related requirements into logical, high-level Epics (typically 3-6 epics)
-3. Each epic should represent a major feature area or business capability
-4. Ensure EVERY requirement is mapped to an epic (use the requirement IDs)
-5. Estimate the number of user stories (2-10) and story points (10-50) for each epic based on complexity
-6. Assign priority based on business value: High, Medium, or Low
-7. Create meaningful titles and descriptions that reflect the actual requirements
-
-**Output Format** (JSON array):
-[
-  {{
-    "id": 1,
-    "title": "Epic Name",
-    "description": "Detailed description of what this epic covers",
-    "stories": 5,
-    "points": 25,
-    "priority": "High",
-    "requirements_mapped": ["req-id-1", "req-id-2"]
-  }}
-]
-
-Return ONLY the JSON array, no additional text."""
+Return ONLY the JSON object, no additional text."""
 
+        params = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert Product Manager who creates well-structured Epics from requirements. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens,
+            prompt_cache_key="tao-epics-v1",
+            response_format=EPICS_RESPONSE_FORMAT
+        )
+        if stream:
+            return self._stream_epics(params, self._generate_fallback_epics(gherkin_reqs))
+        
         try:
             # Call OpenAI API
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert Product Manager who creates well-structured Epics from requirements. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
+            content, cache_key = await self._complete(**params)
             
-            # Parse the response
-            content = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            epics = json.loads(content)
+            epics = [
+                _fill_epic_defaults(item.model_dump(), idx)
+                for idx, item in enumerate(EpicList.model_validate_json(content).epics, 1)
+            ]
             
             # Validate and ensure proper structure
-            if isinstance(epics, list) and len(epics) > 0:
-                # Ensure all epics have required fields
-                for epic in epics:
-                    if 'id' not in epic:
-                        epic['id'] = epics.index(epic) + 1
-                    if 'title' not in epic:
-                        epic['title'] = f"Epic {epic['id']}"
-                    if 'description' not in epic:
-                        epic['description'] = "Epic description"
-                    if 'stories' not in epic:
-                        epic['stories'] = 5
-                    if 'points' not in epic:
-                        epic['points'] = epic['stories'] * 5
-                    if 'priority' not in epic:
-                        epic['priority'] = "Medium"
-                    if 'requirements_mapped' not in epic:
-                        epic['requirements_mapped'] = []
-                
-                print(f"[OK] Generated {len(epics)} epics using OpenAI")
+            if epics:
+                # Only a response that parsed and validated is worth reusing
+                _cache_response(cache_key, content)
+                logger.info("Generated %d epics using OpenAI", len(epics))
                 return epics
             else:
                 raise ValueError("Invalid epic structure from OpenAI")
                 
-        except Exception as e:
-            print(f"[WARNING] Error generating epics with OpenAI: {str(e)}")
-            print(f"Falling back to template-based generation")
-            
-            # Fallback: Create simplified epics from requirements
-            epics = []
-            epic_id = 1
-            
-            if gherkin_reqs:
-                # Group requirements into 3-4 epics
-                reqs_per_epic = max(2, len(gherkin_reqs) // 3)
-                
-                for i in range(0, len(gherkin_reqs), reqs_per_epic):
-                    batch = gherkin_reqs[i:i+reqs_per_epic]
-                    if not batch:
-                        continue
-                    
-                    title = batch[0].get('feature', f'Epic {epic_id}')
-                    num_stories = min(10, len(batch) * 2)
-                    estimated_points = num_stories * 5
-                    
-                    epic = {
-                        "id": epic_id,
-                        "title": title,
-                        "description": f"Implementation of {len(batch)} related requirements",
-                        "stories": num_stories,
-                        "points": estimated_points,
-                        "priority": "High",
-                        "requirements_mapped": [req.get('id', f'req-{i}') for req in batch]
-                    }
-                    epics.append(epic)
-                    epic_id += 1
-                    
-                    if epic_id > 4:
-                        break
-        
-            return epics if epics else [
-                {
-                    "id": 1,
-                    "title": "Core System Features",
-                    "description": "Implement core system functionality",
-                    "stories": 5,
-                    "points": 25,
-                    "priority": "High",
-                    "requirements_mapped": []
-                }
-            ]
-    
-    async def _generate_user_stories(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """
-        Generate user stories based on epics and Gherkin requirements using OpenAI
-        
-        Creates detailed user stories with acceptance criteria from actual requirements
-        """
-        epics = data.get('epics', [])
-        gherkin_reqs = data.get('gherkinRequirements', [])
-        requirements = data.get('requirements', [])
-        prd = data.get('prd', '')
-        brd = data.get('brd', '')
-        project_info = data.get('project', {})
-        
-        if not epics:
-            # Need epics first to generate stories
-            return []
-        
-        # Prepare context for OpenAI
-        epics_context = ""
-        for epic in epics:
-            epics_context += f"\n**Epic {epic.get('id')}**: {epic.get('title')}\n"
-            epics_context += f"  - Description: {epic.get('description')}\n"
-            epics_context += f"  - Priority: {epic.get('priority')}\n"
-            epics_context += f"  - Expected Stories: {epic.get('stories')}\n"
-            epics_context += f"  - Story Points: {epic.get('points')}\n"
-            epics_context += f"  - Requirements Mapped: {', '.join(epic.get('requirements_mapped', []))}\n"
-        
-        # Prepare requirements context
-        requirements_context = ""
+        except Exception as e:
+            logger.warning("Error generating epics with OpenAI, falling back to template-based generation: %s", e)
+            
+            return self._generate_fallback_epics(gherkin_reqs)
+    
+    def _build_story_context(self, gherkin_reqs: List[Dict[str, Any]]) -> str:
+        """Format the Gherkin requirements for the user story prompts"""
+        context_parts = []
         if gherkin_reqs:
-            requirements_context += "\n### Gherkin Requirements:\n"
+            context_parts.append("\n### Gherkin Requirements:\n")
             for req in gherkin_reqs:
-                requirements_context += f"\n**{req.get('feature')}** (ID: {req.get('id')})\n"
-                requirements_context += f"  - As a {req.get('as_a')}, I want {req.get('i_want')}\n"
-                requirements_context += f"  - So that {req.get('so_that')}\n"
+                context_parts.append(f"\n**{req.get('feature')}** (ID: {req.get('id')})\n")
+                context_parts.append(f"  - As a {req.get('as_a')}, I want {req.get('i_want')}\n")
+                context_parts.append(f"  - So that {req.get('so_that')}\n")
                 
                 scenarios = req.get('scenarios', [])
                 if scenarios:
-                    requirements_context += f"  - Scenarios:\n"
+                    context_parts.append(f"  - Scenarios:\n")
                     for scenario in scenarios:
-                        requirements_context += f"    * {scenario.get('title')}\n"
+                        context_parts.append(f"    * {scenario.get('title')}\n")
                         if scenario.get('given'):
-                            requirements_context += f"      - Given: {', '.join(scenario.get('given'))}\n"
+                            context_parts.append(f"      - Given: {', '.join(scenario.get('given'))}\n")
                         if scenario.get('when'):
-                            requirements_context += f"      - When: {', '.join(scenario.get('when'))}\n"
+                            context_parts.append(f"      - When: {', '.join(scenario.get('when'))}\n")
                         if scenario.get('then'):
-                            requirements_context += f"      - Then: {', '.join(scenario.get('then'))}\n"
+                            context_parts.append(f"      - Then: {', '.join(scenario.get('then'))}\n")
+        return "".join(context_parts)
+    
+    async def _generate_story_group(
+        self,
+        epics: List[Dict[str, Any]],
+        requirements_context: str,
+        project_info: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], str, str]:
+        """
+        Generate the user stories for one group of epics
+        
+        Returns the parsed stories with the raw response and its cache key,
+        so the caller can cache it once every group has validated
+        """
+        epic_parts = []
+        for epic in epics:
+            epic_parts.append(f"\n**Epic {epic.get('id')}**: {epic.get('title')}\n")
+            epic_parts.append(f"  - Description: {epic.get('description')}\n")
+            epic_parts.append(f"  - Priority: {epic.get('priority')}\n")
+            epic_parts.append(f"  - Expected Stories: {epic.get('stories')}\n")
+            epic_parts.append(f"  - Story Points: {epic.get('points')}\n")
+            epic_parts.append(f"  - Requirements Mapped: {', '.join(epic.get('requirements_mapped', []))}\n")
+        epics_context = "".join(epic_parts)
         
         # Create prompt for OpenAI
         prompt = f"""You are an expert Agile Scrum Master and Product Owner. Based on the Epics created in Phase 2 (Planning & Backlog) and the requirements from Phase 1, generate detailed User Stories with acceptance criteria.
 
-**Project**: {project_info.get('name', 'Software Project')}
-
-## Epics Generated:
-{epics_context}
-
-## Requirements from Phase 1:
-{requirements_context}
-
 **Instructions**:
 1. For EACH Epic, generate user stories that match the "Expected Stories" count
 2. Base stories on the actual requirements mapped to each epic (use the requirement IDs)
@@ -549,83 +1528,105 @@ Return ONLY the JSON array, no additional text."""
 7. All stories should be in "backlog" status with no sprint assigned initially
 8. Stories should cover: core functionality, UI/UX, testing, integration, security, error handling, and documentation
 
-**Output Format** (JSON array):
-[
-  {{
-    "id": 1,
-    "epic": "Epic Title",
-    "epic_id": 1,
-    "title": "As a user, I want to...",
-    "description": "Detailed description of what needs to be done",
-    "acceptance_criteria": ["Criterion 1", "Criterion 2", "Criterion 3"],
-    "points": 5,
-    "priority": "High",
-    "sprint": null,
-                            "status": "backlog"
-  }}
-]
-
-Return ONLY the JSON array with all user stories, no additional text."""
+**Output Format** (JSON object):
+{{
+  "stories": [
+    {{
+      "id": 1,
+      "epic": "Epic Title",
+      "epic_id": 1,
+      "title": "As a user, I want to...",
+      "description": "Detailed description of what needs to be done",
+      "acceptance_criteria": ["Criterion 1", "Criterion 2", "Criterion 3"],
+      "points": 5,
+      "priority": "High",
+      "sprint": null,
+      "status": "backlog"
+    }}
+  ]
+}}
 
+**Project**: {project_info.get('name', 'Software Project')}
+
+## Requirements from Phase 1:
+{requirements_context}
+
+## Epics Generated:
+{epics_context}
+
+Return ONLY the JSON object with all user stories, no additional text."""
+        
+        content, cache_key = await self._complete(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert Scrum Master who creates detailed user stories from epics and requirements. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=_stories_max_tokens(epics),
+            prompt_cache_key="tao-stories-v1",
+            response_format=USER_STORIES_RESPONSE_FORMAT
+        )
+        stories = [item.model_dump() for item in UserStoryList.model_validate_json(content).stories]
+        return stories, content, cache_key
+    
+    async def _generate_user_stories(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Generate user stories based on epics and Gherkin requirements using OpenAI
+        
+        Creates detailed user stories with acceptance criteria from actual requirements
+        """
+        epics = data.get('epics', [])
+        gherkin_reqs = data.get('gherkinRequirements', [])
+        requirements = data.get('requirements', [])
+        prd = data.get('prd', '')
+        brd = data.get('brd', '')
+        project_info = data.get('project', {})
+        
+        if not epics:
+            # Need epics first to generate stories
+            return []
+        
+        # Prepare requirements context, shared by every epic group. Large
+        # requirement sets take a while to format, so keep it off the event loop
+        requirements_context = await asyncio.to_thread(self._build_story_context, gherkin_reqs)
+        
         try:
-            # Call OpenAI API
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert Scrum Master who creates detailed user stories from epics and requirements. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
+            # One call per group of epics, run in parallel; each stays well under
+            # the output limit that a single call for a large backlog would hit.
+            # return_exceptions lets every call finish before an error is raised
+            results = await asyncio.gather(
+                *[
+                    self._generate_story_group(group, requirements_context, project_info)
+                    for group in _group_epics(epics)
                 ],
-                temperature=0.7,
-                max_tokens=4000
+                return_exceptions=True
             )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
             
-            # Parse the response
-            content = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            user_stories = json.loads(content)
+            user_stories = [story for stories, _, _ in results for story in stories]
             
             # Validate and ensure proper structure
-            if isinstance(user_stories, list) and len(user_stories) > 0:
-                story_id = 1
-                for story in user_stories:
+            if user_stories:
+                for idx, story in enumerate(user_stories, 1):
                     # Ensure required fields
-                    story['id'] = story_id
-                    story_id += 1
-                    
-                    if 'epic' not in story:
-                        story['epic'] = "Unknown Epic"
-                    if 'epic_id' not in story:
-                        story['epic_id'] = 1
-                    if 'title' not in story:
-                        story['title'] = "User Story"
-                    if 'description' not in story:
-                        story['description'] = "Story description"
-                    if 'acceptance_criteria' not in story:
-                        story['acceptance_criteria'] = []
-                    if 'points' not in story:
-                        story['points'] = 5
-                    if 'priority' not in story:
-                        story['priority'] = "Medium"
-                    if 'sprint' not in story:
-                        story['sprint'] = None
-                    if 'status' not in story:
-                        story['status'] = "backlog"
+                    story['id'] = idx
+                    for key, value in USER_STORY_DEFAULTS.items():
+                        if key not in story:
+                            story[key] = value.copy() if isinstance(value, list) else value
                 
-                print(f"[OK] Generated {len(user_stories)} user stories using OpenAI")
+                # Only responses that parsed and validated are worth reusing
+                for _, content, cache_key in results:
+                    _cache_response(cache_key, content)
+                logger.info("Generated %d user stories using OpenAI", len(user_stories))
                 return user_stories
             else:
                 raise ValueError("Invalid user story structure from OpenAI")
                 
         except Exception as e:
-            print(f"[WARNING] Error generating user stories with OpenAI: {str(e)}")
-            print(f"Falling back to template-based generation")
+            logger.warning("Error generating user stories with OpenAI, falling back to template-based generation: %s", e)
             
             # Fallback: Generate basic stories from epics
             user_stories = []
@@ -680,10 +1681,7 @@ Return ONLY the JSON array with all user stories, no additional text."""
             points = 2
         
         # Add points for complexity keywords
-        complexity_keywords = ['integrate', 'api', 'payment', 'security', 'authentication', 'sync', 'complex']
-        desc_lower = description.lower()
-        
-        if any(keyword in desc_lower for keyword in complexity_keywords):
+        if _COMPLEXITY_RE.search(description):
             points += 2
         
         # Cap at 13 (anything larger should be broken down)
@@ -693,205 +1691,36 @@ Return ONLY the JSON array with all user stories, no additional text."""
         """
         Generate system architecture based on epics and user stories
         
-        Creates architecture components, technology stack, database design, and API design
+        Creates architecture components, technology stack, database design, and API design.
+        The result depends only on the epic titles, so it is memoized on them and
+        each caller gets its own copy.
         """
         epics = data.get('epics', [])
-        user_stories = data.get('userStories', [])
-        
-        if not epics:
+        # Lowercase the joined titles in one pass rather than title by title
+        all_epic_text = ' '.join(epic.get('title', '') for epic in epics).lower() if epics else None
+        return orjson.loads(self._build_architecture(all_epic_text))
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _build_architecture(all_epic_text: Optional[str]) -> bytes:
+        """Architecture for the joined, lowercased epic titles, serialized with orjson"""
+        if all_epic_text is None:
             # Return default architecture if no epics
-            return {
-                "components": [
-                    {
-                        "id": 1,
-                        "name": "Frontend Application",
-                        "type": "frontend",
-                        "description": "User-facing web application",
-                        "technologies": ["React", "TypeScript", "Tailwind CSS"]
-                    },
-                    {
-                        "id": 2,
-                        "name": "Backend API",
-                        "type": "backend",
-                        "description": "RESTful API server",
-                        "technologies": ["Node.js", "Express", "PostgreSQL"]
-                    }
-                ],
-                "techStack": {
-                    "frontend": ["React", "TypeScript", "Tailwind CSS"],
-                    "backend": ["Node.js", "Express", "JWT"],
-                    "infrastructure": ["Docker", "AWS", "PostgreSQL"]
-                },
-                "database": {},
-                "api": {}
-            }
-        
-        # Generate architecture components based on epics
-        components = []
-        component_id = 1
-        
-        # Core components
-        components.append({
-            "id": component_id,
-            "name": "Frontend Application",
-            "type": "frontend",
-            "description": "User-facing web application with responsive design",
-            "technologies": ["React", "TypeScript", "Tailwind CSS", "Vite"]
-        })
-        component_id += 1
-        
-        components.append({
-            "id": component_id,
-            "name": "Backend API Server",
-            "type": "backend",
-            "description": "RESTful API handling business logic and data management",
-            "technologies": ["FastAPI", "Python", "Pydantic", "SQLAlchemy"]
-        })
-        component_id += 1
-        
-        components.append({
-            "id": component_id,
-            "name": "PostgreSQL Database",
-            "type": "database",
-            "description": "Primary data storage with relational schema",
-            "technologies": ["PostgreSQL", "pgVector", "Alembic"]
-        })
-        component_id += 1
-        
-        # Check for specific features from epics and add components
-        epic_titles = [epic.get('title', '').lower() for epic in epics]
-        all_epic_text = ' '.join(epic_titles)
-        
-        if any(word in all_epic_text for word in ['auth', 'login', 'user', 'security']):
-            components.append({
-                "id": component_id,
-                "name": "Authentication Service",
-                "type": "security",
-                "description": "User authentication and authorization system",
-                "technologies": ["JWT", "bcrypt", "OAuth 2.0", "Session Management"]
-            })
-            component_id += 1
-        
-        if any(word in all_epic_text for word in ['payment', 'billing', 'subscription']):
-            components.append({
-                "id": component_id,
-                "name": "Payment Gateway Integration",
-                "type": "integration",
-                "description": "Payment processing and billing management",
-                "technologies": ["Stripe API", "Webhook Handler", "PCI Compliance"]
-            })
-            component_id += 1
-        
-        if any(word in all_epic_text for word in ['notification', 'email', 'alert']):
-            components.append({
-                "id": component_id,
-                "name": "Notification Service",
-                "type": "service",
-                "description": "Email and push notification delivery system",
-                "technologies": ["SendGrid", "Redis Queue", "WebSocket"]
-            })
-            component_id += 1
-        
-        if any(word in all_epic_text for word in ['search', 'analytics', 'dashboard']):
-            components.append({
-                "id": component_id,
-                "name": "Analytics & Reporting",
-                "type": "service",
-                "description": "Data analytics and reporting engine",
-                "technologies": ["Elasticsearch", "Grafana", "Pandas"]
-            })
-            component_id += 1
-        
-        if any(word in all_epic_text for word in ['ai', 'ml', 'copilot', 'chatbot']):
-            components.append({
-                "id": component_id,
-                "name": "AI/ML Service",
-                "type": "service",
-                "description": "AI-powered features and intelligent automation",
-                "technologies": ["OpenAI API", "LangChain", "Vector Database", "RAG"]
-            })
-            component_id += 1
-        
-        # Generate technology stack
-        tech_stack = {
-            "frontend": [
-                "React 18",
-                "TypeScript",
-                "Tailwind CSS",
-                "Vite",
-                "React Router",
-                "Zustand"
-            ],
-            "backend": [
-                "FastAPI",
-                "Python 3.11+",
-                "SQLAlchemy",
-                "Pydantic",
-                "JWT Auth",
-                "CORS Middleware"
-            ],
-            "database": [
-                "PostgreSQL 15+",
-                "Redis (Cache)",
-                "pgVector (AI)",
-                "Alembic (Migrations)"
-            ],
-            "infrastructure": [
-                "Docker",
-                "Docker Compose",
-                "AWS EC2 / DigitalOcean",
-                "Nginx",
-                "GitHub Actions"
-            ],
-            "testing": [
-                "Pytest",
-                "Jest",
-                "React Testing Library",
-                "Playwright"
-            ]
-        }
-        
-        # Generate database schema overview
-        database_schema = {
-            "tables": [
-                {
-                    "name": "users",
-                    "description": "User accounts and authentication",
-                    "key_fields": ["id", "email", "username", "password_hash", "role"]
-                },
-                {
-                    "name": "projects",
-                    "description": "Project information",
-                    "key_fields": ["id", "name", "description", "created_by", "status"]
-                },
-                {
-                    "name": "phases",
-                    "description": "SDLC phases per project",
-                    "key_fields": ["id", "project_id", "phase_number", "status", "data"]
-                }
-            ]
-        }
+            return orjson.dumps(_DEFAULT_ARCHITECTURE, default=dict)
         
-        # Generate API design overview
-        api_design = {
-            "restful_endpoints": [
-                {"method": "POST", "path": "/api/auth/login", "description": "User authentication"},
-                {"method": "GET", "path": "/api/projects", "description": "List all projects"},
-                {"method": "POST", "path": "/api/projects", "description": "Create new project"},
-                {"method": "GET", "path": "/api/projects/{id}", "description": "Get project details"},
-                {"method": "GET", "path": "/api/projects/{id}/phases", "description": "Get project phases"}
-            ],
-            "authentication": "JWT Bearer Token",
-            "data_format": "JSON",
-            "versioning": "URL path (/api/v1/...)"
-        }
+        # Core components, then one for each feature area the epic titles mention
+        categories = _architecture_categories(all_epic_text)
+        components = [
+            *_CORE_COMPONENTS,
+            *(component for category, component in _OPTIONAL_COMPONENTS.items() if category in categories)
+        ]
         
-        return {
-            "components": components,
-            "techStack": tech_stack,
-            "database": database_schema,
-            "api": api_design
-        }
+        return orjson.dumps({
+            "components": [replace(component, id=idx) for idx, component in enumerate(components, 1)],
+            "techStack": _TECH_STACK,
+            "database": _DATABASE_SCHEMA,
+            "api": _API_DESIGN
+        }, default=dict)
     
     async def convert_to_gherkin(self, parsed_content: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -913,71 +1742,18 @@ Return ONLY the JSON array with all user stories, no additional text."""
             # Text too short, return empty
             return []
         
+        # A document already extracted is served before the prompt is even built
+        document_key = _gherkin_document_key(filename, text)
+        cached = _cached_response(document_key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
         # Prepare comprehensive prompt for OpenAI
-        prompt = f"""You are an expert Business Analyst and Requirements Engineer. Analyze the following document and extract ALL requirements in proper Gherkin format.
-
-**Document**: {filename}
-
-**Content**:
-{text[:8000]}  
-
-**Your Task**:
-1. **READ** the entire document carefully
-2. **ANALYZE** and identify all functional and non-functional requirements
-3. **SUMMARIZE** each requirement clearly
-4. **EXTRACT** requirements and convert to proper Gherkin format
-5. **PRIORITIZE** each requirement (Critical/High/Medium/Low) based on:
-   - Business impact
-   - User value
-   - Technical complexity
-   - Dependencies
-
-**Instructions**:
-- Extract EVERY requirement mentioned in the document
-- For each requirement, create:
-  * Clear Feature name
-  * User story in format: "As a [role], I want [goal], so that [benefit]"
-  * Multiple realistic scenarios with Given-When-Then
-  * Priority based on importance indicators in document
-  * Status as "draft"
-- Include:
-  * Functional requirements (what the system should do)
-  * User interactions
-  * Business rules
-  * Data requirements
-  * Integration needs
-  * Security requirements
-  * Performance requirements
-- Make scenarios specific and testable
-- Use actual details from the document, not generic placeholders
-
-**Output Format** (JSON array):
-[
-  {{
-    "id": "req-1",
-    "feature": "Specific Feature Name from Document",
-    "as_a": "specific user role from document",
-    "i_want": "specific goal from document",
-    "so_that": "specific benefit from document",
-    "scenarios": [
-      {{
-        "title": "Specific scenario from document",
-        "given": ["specific precondition 1", "specific precondition 2"],
-        "when": ["specific action 1", "specific action 2"],
-        "then": ["specific expected result 1", "specific expected result 2"]
-      }}
-    ],
-    "priority": "Critical|High|Medium|Low",
-    "status": "draft",
-    "notes": "Any important notes or clarifications from document"
-  }}
-]
-
-Return ONLY the JSON array with ALL extracted requirements. Be thorough and extract everything mentioned in the document."""
-
+        prompt = _GHERKIN_PROMPT_TEMPLATE.format(filename=filename, text=truncate_tokens(text, DOCUMENT_MAX_TOKENS))
+        
         try:
             # Call OpenAI API
-            response = await self.client.chat.completions.create(
+            content, cache_key = await self._stream_text(
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -987,55 +1763,44 @@ Return ONLY the JSON array with ALL extracted requirements. Be thorough and extr
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,  # Lower temperature for more consistent extraction
-                max_tokens=4000
+                max_tokens=4000,
+                response_format={"type": "json_object"}
             )
             
-            # Parse the response
-            content = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
+            # Remove markdown code fences if present
+            content = _FENCE_RE.sub("", content)
             
-            gherkin_requirements = json.loads(content)
+            # The JSON object wraps the list; a bare array is accepted as well
+            gherkin_requirements = orjson.loads(content)
+            if isinstance(gherkin_requirements, dict):
+                gherkin_requirements = gherkin_requirements.get('requirements')
             
             # Validate and ensure proper structure
             if isinstance(gherkin_requirements, list) and len(gherkin_requirements) > 0:
-                for idx, req in enumerate(gherkin_requirements):
+                for idx, req in enumerate(gherkin_requirements, 1):
                     # Ensure required fields
-                    if 'id' not in req:
-                        req['id'] = f"req-{idx + 1}"
-                    if 'feature' not in req:
-                        req['feature'] = f"Requirement {idx + 1}"
-                    if 'as_a' not in req:
-                        req['as_a'] = "user"
-                    if 'i_want' not in req:
-                        req['i_want'] = "to use this feature"
-                    if 'so_that' not in req:
-                        req['so_that'] = "I can achieve my goals"
-                    if 'scenarios' not in req or not req['scenarios']:
+                    req.setdefault('id', f"req-{idx}")
+                    req.setdefault('feature', f"Requirement {idx}")
+                    for key, value in GHERKIN_DEFAULTS.items():
+                        req.setdefault(key, value)
+                    if not req.get('scenarios'):
                         req['scenarios'] = [{
                             'title': 'Default scenario',
                             'given': ['preconditions are met'],
                             'when': ['user performs action'],
                             'then': ['expected result occurs']
                         }]
-                    if 'priority' not in req:
-                        req['priority'] = "Medium"
-                    if 'status' not in req:
-                        req['status'] = "draft"
                 
-                print(f"[OK] Extracted {len(gherkin_requirements)} requirements from document using OpenAI")
+                # Only a response that parsed and validated is worth reusing
+                _cache_response(cache_key, content)
+                _cache_response(document_key, orjson.dumps(gherkin_requirements).decode())
+                logger.info("Extracted %d requirements from document using OpenAI", len(gherkin_requirements))
                 return gherkin_requirements
             else:
                 raise ValueError("Invalid requirements structure from OpenAI")
                 
         except Exception as e:
-            print(f"[WARNING] Error extracting requirements with OpenAI: {str(e)}")
-            print("Falling back to basic extraction")
+            logger.warning("Error extracting requirements with OpenAI, falling back to basic extraction: %s", e)
             
             # Fallback: Basic extraction
             return [{
@@ -1067,53 +1832,22 @@ Return ONLY the JSON array with ALL extracted requirements. Be thorough and extr
             Complete PRD document in markdown format
         """
         # Prepare requirements summary
-        req_summary = ""
+        summary_parts = []
         for idx, req in enumerate(requirements, 1):
-            req_summary += f"\n{idx}. **{req.get('feature', 'Feature')}**\n"
-            req_summary += f"   - As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n"
-            req_summary += f"   - So that {req.get('so_that', '')}\n"
-            req_summary += f"   - Priority: {req.get('priority', 'Medium')}\n"
+            summary_parts.append(f"\n{idx}. **{req.get('feature', 'Feature')}**\n")
+            summary_parts.append(f"   - As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n")
+            summary_parts.append(f"   - So that {req.get('so_that', '')}\n")
+            summary_parts.append(f"   - Priority: {req.get('priority', 'Medium')}\n")
             
             scenarios = req.get('scenarios', [])
             if scenarios:
-                req_summary += f"   - Scenarios: {len(scenarios)}\n"
+                summary_parts.append(f"   - Scenarios: {len(scenarios)}\n")
+        req_summary = "".join(summary_parts)
+        
+        prompt = _PRD_FROM_REQUIREMENTS_PROMPT_TEMPLATE.format(project_name=project_name, req_summary=req_summary)
         
-        prompt = f"""You are an expert Product Manager. Generate a comprehensive Product Requirements Document (PRD) based on the following extracted requirements.
-
-**Project**: {project_name}
-
-**Extracted Requirements**:
-{req_summary}
-
-**Instructions**:
-Generate a complete, professional PRD following industry best practices with these sections:
-
-1. **Executive Summary**: Overview and objectives
-2. **Product Overview**: What is being built and why
-3. **Target Users**: Who will use this product
-4. **User Personas**: 2-3 detailed personas based on requirements
-5. **Feature Requirements**: Detailed breakdown of each feature from extracted requirements
-   - Use the actual requirement details
-   - Include user stories
-   - Add acceptance criteria from scenarios
-6. **Functional Requirements**: System capabilities
-7. **Non-Functional Requirements**: Performance, security, scalability
-8. **User Experience**: UI/UX considerations
-9. **Technical Considerations**: Tech stack suggestions
-10. **Success Metrics**: KPIs and measurement criteria
-11. **Timeline & Phases**: Suggested development phases
-12. **Risks & Mitigations**: Potential challenges
-
-**Format**: Markdown with proper headings, lists, and formatting
-**Style**: Professional, clear, actionable
-**Length**: Comprehensive (2000-3000 words)
-
-Use the ACTUAL requirement details provided above. Do not use generic placeholders. Make it specific to the extracted requirements.
-
-Return the complete PRD document in markdown format."""
-
         try:
-            response = await self.client.chat.completions.create(
+            prd_content, cache_key = await self._stream_text(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are an expert Product Manager who creates comprehensive PRDs. Write in markdown format."},
@@ -1123,14 +1857,14 @@ Return the complete PRD document in markdown format."""
                 max_tokens=4000
             )
             
-            prd_content = response.choices[0].message.content.strip()
-            print(f"[OK] Generated PRD from {len(requirements)} requirements using OpenAI")
+            _cache_response(cache_key, prd_content)
+            logger.info("Generated PRD from %d requirements using OpenAI", len(requirements))
             return prd_content
             
         except Exception as e:
-            print(f"[WARNING] Error generating PRD with OpenAI: {str(e)}")
+            logger.warning("Error generating PRD with OpenAI: %s", e)
             # Return basic PRD
-            return self._generate_prd({'requirements': [], 'gherkinRequirements': requirements, 'project': {'name': project_name}})
+            return self._generate_fallback_prd({'name': project_name}, requirements)
     
     async def generate_brd_from_requirements(self, requirements: List[Dict[str, Any]], project_name: str = "Project") -> str:
         """
@@ -1144,49 +1878,17 @@ Return the complete PRD document in markdown format."""
             Complete BRD document in markdown format
         """
         # Prepare requirements summary
-        req_summary = ""
+        summary_parts = []
         for idx, req in enumerate(requirements, 1):
-            req_summary += f"\n{idx}. **{req.get('feature', 'Feature')}** (Priority: {req.get('priority', 'Medium')})\n"
-            req_summary += f"   - User Story: As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n"
-            req_summary += f"   - Business Value: {req.get('so_that', '')}\n"
+            summary_parts.append(f"\n{idx}. **{req.get('feature', 'Feature')}** (Priority: {req.get('priority', 'Medium')})\n")
+            summary_parts.append(f"   - User Story: As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n")
+            summary_parts.append(f"   - Business Value: {req.get('so_that', '')}\n")
+        req_summary = "".join(summary_parts)
+        
+        prompt = _BRD_FROM_REQUIREMENTS_PROMPT_TEMPLATE.format(project_name=project_name, req_summary=req_summary)
         
-        prompt = f"""You are an expert Business Analyst. Generate a comprehensive Business Requirements Document (BRD) based on the following extracted requirements.
-
-**Project**: {project_name}
-
-**Extracted Requirements**:
-{req_summary}
-
-**Instructions**:
-Generate a complete, professional BRD following industry best practices with these sections:
-
-1. **Executive Summary**: Business case and objectives
-2. **Business Context**: Industry, market, and competitive landscape
-3. **Business Objectives**: Clear, measurable goals (SMART)
-4. **Stakeholders**: Key stakeholders and their interests
-5. **Scope**: In-scope and out-of-scope items based on requirements
-6. **Business Requirements**: High-level business needs
-   - Use the actual extracted requirements
-   - Group by business capability
-   - Link to business value
-7. **Functional Requirements**: Detailed functionality needed
-8. **Business Rules**: Rules and constraints
-9. **Assumptions & Dependencies**: What we're assuming, what we depend on
-10. **Success Criteria**: How we measure success
-11. **Timeline & Budget**: High-level estimates
-12. **Risk Analysis**: Business risks and mitigation strategies
-13. **Approval & Sign-off**: Stakeholder approval process
-
-**Format**: Markdown with proper headings, tables, and formatting
-**Style**: Business-focused, strategic, clear
-**Length**: Comprehensive (2000-3000 words)
-
-Use the ACTUAL requirement details provided above. Focus on BUSINESS VALUE and strategic alignment. Make it specific to the extracted requirements.
-
-Return the complete BRD document in markdown format."""
-
         try:
-            response = await self.client.chat.completions.create(
+            brd_content, cache_key = await self._stream_text(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are an expert Business Analyst who creates comprehensive BRDs. Write in markdown format focusing on business value."},
@@ -1196,14 +1898,31 @@ Return the complete BRD document in markdown format."""
                 max_tokens=4000
             )
             
-            brd_content = response.choices[0].message.content.strip()
-            print(f"[OK] Generated BRD from {len(requirements)} requirements using OpenAI")
+            _cache_response(cache_key, brd_content)
+            logger.info("Generated BRD from %d requirements using OpenAI", len(requirements))
             return brd_content
             
         except Exception as e:
-            print(f"[WARNING] Error generating BRD with OpenAI: {str(e)}")
+            logger.warning("Error generating BRD with OpenAI: %s", e)
             # Return basic BRD
-            return self._generate_brd({'requirements': [], 'gherkinRequirements': requirements, 'project': {'name': project_name}})
+            return self._generate_fallback_brd({'name': project_name}, requirements)
+    
+    async def generate_all_artifacts(self, requirements: List[Dict[str, Any]], project_name: str = "Project") -> Dict[str, Any]:
+        """
+        Generate the PRD, BRD and risk analysis for extracted requirements concurrently
+        
+        The three calls are independent, so the wait is the slowest of them
+        rather than their sum.
+        
+        Returns:
+            Dict with "prd" and "brd" markdown documents and the "risks" list
+        """
+        prd, brd, risks = await asyncio.gather(
+            self.generate_prd_from_requirements(requirements, project_name),
+            self.generate_brd_from_requirements(requirements, project_name),
+            self.analyze_risks(requirements, project_name)
+        )
+        return {"prd": prd, "brd": brd, "risks": risks}
     
     async def analyze_risks(self, requirements: List[Dict[str, Any]], project_name: str = "Project") -> List[Dict[str, Any]]:
         """
@@ -1221,116 +1940,56 @@ Return the complete BRD document in markdown format."""
             return []
         
         # Prepare requirements summary for risk analysis
-        req_summary = ""
+        summary_parts = []
         for idx, req in enumerate(requirements, 1):
-            req_summary += f"\n{idx}. **{req.get('feature', 'Feature')}**\n"
-            req_summary += f"   - Priority: {req.get('priority', 'Medium')}\n"
-            req_summary += f"   - User Story: As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n"
+            summary_parts.append(f"\n{idx}. **{req.get('feature', 'Feature')}**\n")
+            summary_parts.append(f"   - Priority: {req.get('priority', 'Medium')}\n")
+            summary_parts.append(f"   - User Story: As a {req.get('as_a', 'user')}, I want {req.get('i_want', '')}\n")
             
             scenarios = req.get('scenarios', [])
             if scenarios:
-                req_summary += f"   - Complexity: {len(scenarios)} scenarios\n"
+                summary_parts.append(f"   - Complexity: {len(scenarios)} scenarios\n")
+        req_summary = "".join(summary_parts)
+        
+        prompt = _RISK_PROMPT_TEMPLATE.format(project_name=project_name, req_summary=req_summary)
         
-        prompt = f"""You are an expert Risk Analyst and Project Manager. Analyze the following requirements and identify potential risks for this project.
-
-**Project**: {project_name}
-
-**Requirements**:
-{req_summary}
-
-**Instructions**:
-Analyze these requirements and identify risks in the following categories:
-1. **Technical Risks**: Technology challenges, integration issues, performance concerns
-2. **Business Risks**: Market changes, stakeholder alignment, ROI concerns
-3. **Resource Risks**: Team availability, skills gaps, dependencies
-4. **Schedule Risks**: Timeline pressures, dependencies, scope creep
-5. **Quality Risks**: Testing challenges, complexity, technical debt
-
-For each risk, provide:
-- **Risk Name**: Clear, specific risk description
-- **Category**: Technical/Business/Resource/Schedule/Quality
-- **Priority**: Critical/High/Medium/Low (based on likelihood × impact)
-- **Impact**: Severe/High/Medium/Low
-- **Likelihood**: Very Likely/Likely/Possible/Unlikely
-- **Mitigation**: Specific mitigation strategy
-- **Contingency**: What to do if risk occurs
-
-**Priority Calculation**:
-- Critical: High likelihood + High/Severe impact
-- High: Medium/High likelihood + Medium/High impact
-- Medium: Low/Medium likelihood + Medium impact
-- Low: Low likelihood + Low impact
-
-**Output Format** (JSON array):
-[
-  {{
-    "id": "risk-1",
-    "risk": "Specific risk description",
-    "category": "Technical|Business|Resource|Schedule|Quality",
-    "priority": "Critical|High|Medium|Low",
-    "impact": "Severe|High|Medium|Low",
-    "likelihood": "Very Likely|Likely|Possible|Unlikely",
-    "mitigation": "Specific mitigation strategy",
-    "contingency": "Plan if risk occurs",
-    "affected_requirements": ["req-1", "req-2"]
-  }}
-]
-
-Identify 5-10 most significant risks. Be specific to the actual requirements provided. Focus on realistic, actionable risks.
-
-Return ONLY the JSON array."""
-
         try:
-            response = await self.client.chat.completions.create(
+            content, cache_key = await self._stream_text(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are an expert Risk Analyst who identifies and assesses project risks. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.4,  # Lower temperature for more consistent risk analysis
-                max_tokens=2000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
-            content = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
+            # Remove markdown code fences if present
+            content = _FENCE_RE.sub("", content)
             
-            risks = json.loads(content)
+            risks = orjson.loads(content)
+            if isinstance(risks, dict):
+                risks = risks.get('risks')
             
             # Validate and ensure proper structure
             if isinstance(risks, list):
-                for idx, risk in enumerate(risks):
-                    if 'id' not in risk:
-                        risk['id'] = f"risk-{idx + 1}"
-                    if 'risk' not in risk:
-                        risk['risk'] = f"Risk {idx + 1}"
-                    if 'category' not in risk:
-                        risk['category'] = "Technical"
-                    if 'priority' not in risk:
-                        risk['priority'] = "Medium"
-                    if 'impact' not in risk:
-                        risk['impact'] = "Medium"
-                    if 'likelihood' not in risk:
-                        risk['likelihood'] = "Possible"
-                    if 'mitigation' not in risk:
-                        risk['mitigation'] = "To be defined"
-                    if 'contingency' not in risk:
-                        risk['contingency'] = "Monitor and reassess"
-                    if 'affected_requirements' not in risk:
-                        risk['affected_requirements'] = []
+                for idx, risk in enumerate(risks, 1):
+                    risk.setdefault('id', f"risk-{idx}")
+                    risk.setdefault('risk', f"Risk {idx}")
+                    for key, value in RISK_DEFAULTS.items():
+                        if key not in risk:
+                            risk[key] = value.copy() if isinstance(value, list) else value
                 
-                print(f"[OK] Analyzed {len(risks)} risks using OpenAI")
+                # Only a response that parsed and validated is worth reusing
+                _cache_response(cache_key, content)
+                logger.info("Analyzed %d risks using OpenAI", len(risks))
                 return risks
             else:
                 raise ValueError("Invalid risk structure from OpenAI")
                 
         except Exception as e:
-            print(f"[WARNING] Error analyzing risks with OpenAI: {str(e)}")
+            logger.warning("Error analyzing risks with OpenAI: %s", e)
             
             # Fallback: Return basic risk assessment
             return [
@@ -1369,13 +2028,57 @@ Return ONLY the JSON array."""
                 }
             ]
     
+    def _generate_fallback_epics(self, gherkin_reqs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create simplified epics from requirements when OpenAI fails"""
+        epics = []
+        epic_id = 1
+        
+        if gherkin_reqs:
+            # Group requirements into 3-4 epics
+            reqs_per_epic = max(2, len(gherkin_reqs) // 3)
+            
+            for i in range(0, len(gherkin_reqs), reqs_per_epic):
+                batch = gherkin_reqs[i:i+reqs_per_epic]
+                if not batch:
+                    continue
+                
+                title = batch[0].get('feature', f'Epic {epic_id}')
+                num_stories = min(10, len(batch) * 2)
+                estimated_points = num_stories * 5
+                
+                epic = {
+                    "id": epic_id,
+                    "title": title,
+                    "description": f"Implementation of {len(batch)} related requirements",
+                    "stories": num_stories,
+                    "points": estimated_points,
+                    "priority": "High",
+                    "requirements_mapped": [req.get('id', f'req-{i}') for req in batch]
+                }
+                epics.append(epic)
+                epic_id += 1
+                
+                if epic_id > 4:
+                    break
+    
+        return epics if epics else [
+            {
+                "id": 1,
+                "title": "Core System Features",
+                "description": "Implement core system functionality",
+                "stories": 5,
+                "points": 25,
+                "priority": "High",
+                "requirements_mapped": []
+            }
+        ]
+    
     def _generate_fallback_prd(self, project_info: Dict[str, Any], requirements: List[Dict[str, Any]]) -> str:
         """Generate basic PRD when OpenAI fails"""
-        features_section = ""
-        for idx, req in enumerate(requirements, 1):
-            feature_name = req.get('feature', req.get('title', f'Feature {idx}'))
-            priority = req.get('priority', 'Medium')
-            features_section += f"\n### {idx}. {feature_name}\n**Priority**: {priority}\n\n"
+        features_section = "".join(
+            f"\n### {idx}. {req.get('feature', req.get('title', f'Feature {idx}'))}\n**Priority**: {req.get('priority', 'Medium')}\n\n"
+            for idx, req in enumerate(requirements, 1)
+        )
         
         return f"""# Product Requirements Document (PRD)
 
@@ -1395,11 +2098,10 @@ Total Requirements: {len(requirements)}
     
     def _generate_fallback_brd(self, project_info: Dict[str, Any], requirements: List[Dict[str, Any]]) -> str:
         """Generate basic BRD when OpenAI fails"""
-        scope_items = ""
-        for idx, req in enumerate(requirements, 1):
-            feature_name = req.get('feature', req.get('title', f'Feature {idx}'))
-            priority = req.get('priority', 'Medium')
-            scope_items += f"- {feature_name} (Priority: {priority})\n"
+        scope_items = "".join(
+            f"- {req.get('feature', req.get('title', f'Feature {idx}'))} (Priority: {req.get('priority', 'Medium')})\n"
+            for idx, req in enumerate(requirements, 1)
+        )
         
         return f"""# Business Requirements Document (BRD)
 
@@ -1424,3 +2126,13 @@ Total Requirements: {len(requirements)}
 ---
 *Generated by TAO SDLC AI Copilot (Fallback Mode)*"""
 
+
+# Singleton instance
+_ai_service = None
+
+def get_ai_service() -> AIService:
+    """Get or create AI service instance"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
@@ -2,204 +2,55 @@
 Conversational AI Service for Interactive SDLC Guidance
 This service provides intelligent, context-aware assistance throughout the SDLC
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping, Optional
+from functools import lru_cache
+from types import MappingProxyType
 import json
 import re
-
-class ConversationalAIService:
-    def __init__(self):
-        self.context_memory = {}
-        self.current_phase_prompts = {
-            1: self._get_phase1_prompts(),
-            2: self._get_phase2_prompts(),
-            3: self._get_phase3_prompts(),
-            4: self._get_phase4_prompts(),
-            5: self._get_phase5_prompts(),
-            6: self._get_phase6_prompts()
-        }
-    
-    def process_conversational_query(
-        self, 
-        query: str, 
-        project_context: Dict[str, Any],
-        phase_id: int,
-        conversation_history: List[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
-        """
-        Process user query in a conversational manner and provide intelligent responses
-        """
-        # Detect intent
-        intent = self._detect_intent(query, phase_id)
-        
-        # Get phase-specific context
-        phase_context = project_context.get('phases', {}).get(str(phase_id), {})
-        
-        # Generate response based on intent
-        if intent == "create_project":
-            return self._guide_project_creation(query, project_context)
-        elif intent == "start_phase":
-            return self._guide_phase_start(phase_id, project_context)
-        elif intent == "generate_content":
-            return self._generate_phase_content(query, phase_id, project_context)
-        elif intent == "review_approval":
-            return self._guide_approval_process(phase_id, project_context)
-        elif intent == "next_steps":
-            return self._suggest_next_steps(phase_id, project_context)
-        else:
-            return self._provide_contextual_help(query, phase_id, project_context)
-    
-    def _detect_intent(self, query: str, phase_id: int) -> str:
-        """Detect user intent from query"""
-        query_lower = query.lower()
-        
-        # Project creation
-        if any(keyword in query_lower for keyword in ['create project', 'new project', 'start project', 'trucking']):
-            return "create_project"
-        
-        # Phase start
-        if any(keyword in query_lower for keyword in ['start phase', 'begin phase', 'move to phase']):
-            return "start_phase"
-        
-        # Content generation
-        if any(keyword in query_lower for keyword in ['generate', 'create prd', 'create brd', 'write', 'design']):
-            return "generate_content"
-        
-        # Approval
-        if any(keyword in query_lower for keyword in ['approval', 'review', 'stakeholder']):
-            return "review_approval"
-        
-        # Next steps
-        if any(keyword in query_lower for keyword in ['next', 'what should', 'what do']):
-            return "next_steps"
-        
-        return "help"
-    
-    def _guide_project_creation(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Guide user through project creation"""
-        
-        # Check if trucking project mentioned
-        is_trucking = 'truck' in query.lower()
-        
-        if is_trucking:
-            return {
-                "response": """🚚 Great! Let's create a Zero-Emission Trucking project!
-
-I'll help you set this up. Here's what I understand:
-
-**Project: Zero-Emission Trucking Platform**
-- Focus: Modernizing logistics in the automobile industry
-- Key Features: Zero-emission trucks (ZETs) + Advanced fleet management
-
-Let me ask a few questions to get started:
-
-1️⃣ **What's your primary goal?**
-   - Develop ZET vehicles
-   - Build fleet management software
-   - Both vehicle and software platform
-
-2️⃣ **Target timeline?**
-   - 6 months (MVP)
-   - 12 months (Full release)
-   - 18+ months (Enterprise solution)
-
-3️⃣ **Key stakeholders?**
-   - Product team
-   - Engineering team
-   - Business stakeholders
-   - Regulatory/Compliance team
-
-Just respond naturally, and I'll create the project structure for you! 🎯""",
-                "confidence_score": 95,
-                "action": "await_user_input",
-                "suggested_responses": [
-                    "Both vehicle and software platform, 12 months timeline",
-                    "Fleet management software, 6 months MVP",
-                    "Full enterprise solution with all teams involved"
-                ],
-                "artifacts": {
-                    "project_template": {
-                        "name": "Zero-Emission Trucking Platform",
-                        "description": "A trucking project in the automobile industry focusing on modernizing logistics through zero-emission trucks and advanced fleet management software",
-                        "industry": "Automobile/Logistics",
-                        "type": "Vehicle + Software Platform"
-                    }
-                }
-            }
-        else:
-            return {
-                "response": """👋 I'll help you create a new project!
-
-To get started, I need to understand your project better. Tell me:
-
-1. **What are you building?** (e.g., mobile app, web platform, IoT system)
-2. **What problem does it solve?**
-3. **Who are the users?**
-4. **Any specific industry?** (e.g., healthcare, fintech, logistics)
-
-You can answer in any format - I'll understand! 😊
-
-**Example:** "I want to build a trucking platform for zero-emission vehicles with fleet management"
-""",
-                "confidence_score": 85,
-                "action": "await_user_input",
-                "suggested_responses": [
-                    "Healthcare app for patient management",
-                    "E-commerce platform with AI recommendations",
-                    "IoT system for smart buildings"
-                ]
-            }
-    
-    def _guide_phase_start(self, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Guide user through starting a phase"""
-        
-        prompts = self.current_phase_prompts.get(phase_id, {})
-        
-        return {
-            "response": f"""✨ Let's start **{prompts['name']}**!
-
-{prompts['description']}
-
-**What we'll accomplish:**
-{self._format_list(prompts['key_activities'])}
-
-**Deliverables:**
-{self._format_list(prompts['deliverables'])}
-
-**I can help you with:**
-{self._format_list(prompts['ai_assistance'])}
-
-What would you like to start with? Just tell me naturally! 🎯""",
-            "confidence_score": 90,
-            "action": "await_user_input",
-            "phase_id": phase_id,
-            "artifacts": prompts
-        }
-    
-    def _generate_phase_content(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate phase-specific content"""
-        
-        if phase_id == 1:
-            return self._generate_requirements(query, context)
-        elif phase_id == 2:
-            return self._generate_backlog(query, context)
-        elif phase_id == 3:
-            return self._generate_architecture(query, context)
-        elif phase_id == 4:
-            return self._generate_detailed_design(query, context)
-        elif phase_id == 5:
-            return self._generate_code_tests(query, context)
-        elif phase_id == 6:
-            return self._generate_deployment_plan(query, context)
-    
-    def _generate_requirements(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Phase 1 content - Requirements"""
-        
-        project_name = context.get('project_name', 'Your Project')
-        project_desc = context.get('description', '')
-        
-        # For trucking project
-        if 'truck' in project_desc.lower():
-            prd_content = """# Product Requirements Document (PRD)
+from app.services.frozen import freeze
+
+# Intents returned by _detect_intent; the keyword table and the handler table
+# key on these same string objects
+INTENT_CREATE_PROJECT = "create_project"
+INTENT_START_PHASE = "start_phase"
+INTENT_GENERATE_CONTENT = "generate_content"
+INTENT_REVIEW_APPROVAL = "review_approval"
+INTENT_NEXT_STEPS = "next_steps"
+INTENT_HELP = "help"
+
+# Intent keywords in priority order: the first intent with a keyword in the query wins
+INTENT_KEYWORDS = {
+    INTENT_CREATE_PROJECT: frozenset({'create project', 'new project', 'start project', 'trucking'}),
+    INTENT_START_PHASE: frozenset({'start phase', 'begin phase', 'move to phase'}),
+    INTENT_GENERATE_CONTENT: frozenset({'generate', 'create prd', 'create brd', 'write', 'design'}),
+    INTENT_REVIEW_APPROVAL: frozenset({'approval', 'review', 'stakeholder'}),
+    INTENT_NEXT_STEPS: frozenset({'next', 'what should', 'what do'})
+}
+_INTENT_PATTERNS = sorted(frozenset().union(*INTENT_KEYWORDS.values()))
+
+# Fallback scanner for the same keywords: the lookahead finds a match starting at
+# every position, overlapping ones included, like the automaton's overlapping scan
+_INTENT_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _INTENT_PATTERNS)) + "))")
+
+@lru_cache(maxsize=None)
+def _intent_automaton():
+    """Aho-Corasick automaton over the intent keywords; None without ahocorasick_rs"""
+    try:
+        import ahocorasick_rs
+    except ImportError:
+        return None
+    # The keyword set is tiny, so the full DFA (one transition table lookup per
+    # byte, all in Rust) costs next to no memory and is the fastest to scan
+    return ahocorasick_rs.AhoCorasick(_INTENT_PATTERNS, implementation=ahocorasick_rs.Implementation.DFA)
+
+def _format_list(items: List[str]) -> str:
+    """Format list items with bullets"""
+    if not items:
+        return ""
+    return "  • " + "\n  • ".join(items)
+
+# Canned artifacts for the trucking demo project, built once and shared by every response
+_TRUCKING_PRD = """# Product Requirements Document (PRD)
 ## Zero-Emission Trucking Platform
 
 ### 1. Executive Summary
@@ -269,7 +120,7 @@ Transform the logistics industry by providing sustainable, efficient, and cost-e
 - Timeline: 12 months
 """
 
-            brd_content = """# Business Requirements Document (BRD)
+_TRUCKING_BRD = """# Business Requirements Document (BRD)
 ## Zero-Emission Trucking Platform
 
 ### 1. Business Context
@@ -350,212 +201,84 @@ The logistics industry faces increasing pressure to reduce carbon emissions whil
 - ROI positive within 18 months
 """
 
-            return {
-                "response": """✅ I've generated comprehensive requirements for your Zero-Emission Trucking Platform!
-
-**📄 Product Requirements Document (PRD)**
-- Executive Summary
-- Core Features (ZET Management, Fleet Management, Driver Portal, Analytics)
-- Technical Requirements
-- Success Metrics
-
-**📊 Business Requirements Document (BRD)**
-- Business Context & Objectives
-- Stakeholders & Business Rules
-- Budget: $2.5M over 12 months
-- Team Structure (12 people)
-- Risk Assessment
-
-**💡 Key Highlights:**
-✅ 30% cost reduction target
-✅ 100% zero-emission operations
-✅ Real-time tracking & analytics
-✅ Mobile-first approach
-
-**What would you like to do next?**
-1. Review and refine these documents
-2. Add more specific requirements
-3. Move to Phase 2 (Planning & Backlog)
-4. Set up stakeholder approvals
-
-The documents are ready in the sidebar! 👉""",
-                "confidence_score": 92,
-                "action": "content_generated",
-                "artifacts": {
-                    "prd": prd_content,
-                    "brd": brd_content,
-                    "type": "requirements_documents"
-                },
-                "suggested_actions": [
-                    "Review PRD/BRD",
-                    "Refine requirements",
-                    "Move to Phase 2",
-                    "Setup approvals"
-                ]
-            }
-        
-        return {
-            "response": f"""📝 Let me generate requirements for {project_name}!
-
-To create comprehensive PRD and BRD, I need a bit more context:
-
-1. **Core features** - What are the main capabilities?
-2. **Users** - Who will use this?
-3. **Business goals** - What's the success criteria?
-
-Tell me more about your project!""",
-            "confidence_score": 75,
-            "action": "await_user_input"
-        }
-    
-    def _generate_backlog(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Phase 2 content - Backlog"""
-        
-        if 'truck' in context.get('description', '').lower():
-            epics = [
-                {
-                    "title": "Zero-Emission Vehicle Management",
-                    "description": "Complete system for managing electric trucks including battery monitoring, charging, and maintenance",
-                    "stories": 15,
-                    "points": 55,
-                    "priority": "High",
-                    "user_stories": [
-                        "As a fleet manager, I want to monitor battery levels in real-time",
-                        "As a driver, I want to find nearby charging stations",
-                        "As a maintenance team, I want to receive predictive maintenance alerts",
-                        "As an operator, I want to schedule charging during off-peak hours",
-                        "As a manager, I want to track energy consumption per vehicle"
-                    ]
-                },
-                {
-                    "title": "Fleet Operations & Tracking",
-                    "description": "Real-time tracking, route optimization, and operational management",
-                    "stories": 20,
-                    "points": 75,
-                    "priority": "High",
-                    "user_stories": [
-                        "As a dispatcher, I want to track all vehicles in real-time",
-                        "As a logistics manager, I want optimized route suggestions",
-                        "As an operator, I want to assign drivers to vehicles",
-                        "As a manager, I want to monitor delivery performance",
-                        "As a customer, I want to track my shipment location"
-                    ]
-                },
-                {
-                    "title": "Driver Mobile Application",
-                    "description": "Mobile app for drivers with route guidance, delivery confirmation, and communication",
-                    "stories": 12,
-                    "points": 40,
-                    "priority": "High",
-                    "user_stories": [
-                        "As a driver, I want turn-by-turn navigation",
-                        "As a driver, I want to confirm deliveries digitally",
-                        "As a driver, I want to communicate with dispatch",
-                        "As a driver, I want to see my schedule",
-                        "As a driver, I want to report vehicle issues"
-                    ]
-                },
-                {
-                    "title": "Analytics & Reporting Dashboard",
-                    "description": "Comprehensive analytics for fleet performance, costs, and environmental impact",
-                    "stories": 18,
-                    "points": 65,
-                    "priority": "Medium",
-                    "user_stories": [
-                        "As a manager, I want to see fleet performance KPIs",
-                        "As a CFO, I want cost analysis reports",
-                        "As an operator, I want environmental impact metrics",
-                        "As an analyst, I want predictive analytics",
-                        "As a stakeholder, I want custom reports"
-                    ]
-                }
-            ]
-            
-            sprint_plan = {
-                "total_sprints": 8,
-                "sprint_duration": "2 weeks",
-                "team_velocity": 30,
-                "total_points": 235,
-                "sprints": [
-                    {"number": 1, "focus": "Vehicle Management - Battery & Charging", "points": 30},
-                    {"number": 2, "focus": "Vehicle Management - Maintenance & Monitoring", "points": 25},
-                    {"number": 3, "focus": "Fleet Tracking - Real-time Location", "points": 30},
-                    {"number": 4, "focus": "Fleet Operations - Route Optimization", "points": 30},
-                    {"number": 5, "focus": "Driver App - Core Features", "points": 25},
-                    {"number": 6, "focus": "Driver App - Advanced Features", "points": 15},
-                    {"number": 7, "focus": "Analytics Dashboard - Core Metrics", "points": 30},
-                    {"number": 8, "focus": "Analytics Dashboard - Advanced Reports", "points": 35}
-                ]
-            }
-            
-            return {
-                "response": """✅ I've created a comprehensive Product Backlog for your Trucking Platform!
-
-**📊 Backlog Summary:**
-- **4 Epics** covering all major features
-- **65 User Stories** broken down and ready
-- **235 Story Points** estimated
-- **8 Sprints** planned (2-week cycles)
-
-**🎯 Epics Created:**
-
-1️⃣ **Zero-Emission Vehicle Management** (55 pts, High Priority)
-   - Battery monitoring, charging, predictive maintenance
-   - 15 user stories
-
-2️⃣ **Fleet Operations & Tracking** (75 pts, High Priority)
-   - Real-time GPS, route optimization, dispatch
-   - 20 user stories
-
-3️⃣ **Driver Mobile Application** (40 pts, High Priority)
-   - Navigation, delivery confirmation, communication
-   - 12 user stories
-
-4️⃣ **Analytics & Reporting** (65 pts, Medium Priority)
-   - KPIs, cost analysis, environmental impact
-   - 18 user stories
-
-**📅 Sprint Plan:**
-- Duration: 16 weeks (4 months)
-- Team Velocity: 30 points/sprint
-- Deliverables: MVP after Sprint 6, Full release after Sprint 8
-
-**🔗 Ready to export to Jira!**
-
-What's next?
-1. Review and refine the backlog
-2. Export to Jira
-3. Move to Phase 3 (Architecture)
-4. Adjust story points
-
-Check the sidebar for all details! 👉""",
-                "confidence_score": 94,
-                "action": "content_generated",
-                "artifacts": {
-                    "epics": epics,
-                    "sprint_plan": sprint_plan,
-                    "type": "product_backlog"
-                },
-                "suggested_actions": [
-                    "Review backlog",
-                    "Export to Jira",
-                    "Move to Phase 3",
-                    "Refine estimates"
-                ]
-            }
-        
-        return {
-            "response": "Let me help you create a product backlog! Tell me about the key features...",
-            "confidence_score": 70,
-            "action": "await_user_input"
-        }
-    
-    def _generate_architecture(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Phase 3 content - Architecture"""
-        
-        if 'truck' in context.get('description', '').lower():
-            architecture = {
-                "system_architecture": """# System Architecture - Zero-Emission Trucking Platform
+_TRUCKING_EPICS = [
+    {
+        "title": "Zero-Emission Vehicle Management",
+        "description": "Complete system for managing electric trucks including battery monitoring, charging, and maintenance",
+        "stories": 15,
+        "points": 55,
+        "priority": "High",
+        "user_stories": [
+            "As a fleet manager, I want to monitor battery levels in real-time",
+            "As a driver, I want to find nearby charging stations",
+            "As a maintenance team, I want to receive predictive maintenance alerts",
+            "As an operator, I want to schedule charging during off-peak hours",
+            "As a manager, I want to track energy consumption per vehicle"
+        ]
+    },
+    {
+        "title": "Fleet Operations & Tracking",
+        "description": "Real-time tracking, route optimization, and operational management",
+        "stories": 20,
+        "points": 75,
+        "priority": "High",
+        "user_stories": [
+            "As a dispatcher, I want to track all vehicles in real-time",
+            "As a logistics manager, I want optimized route suggestions",
+            "As an operator, I want to assign drivers to vehicles",
+            "As a manager, I want to monitor delivery performance",
+            "As a customer, I want to track my shipment location"
+        ]
+    },
+    {
+        "title": "Driver Mobile Application",
+        "description": "Mobile app for drivers with route guidance, delivery confirmation, and communication",
+        "stories": 12,
+        "points": 40,
+        "priority": "High",
+        "user_stories": [
+            "As a driver, I want turn-by-turn navigation",
+            "As a driver, I want to confirm deliveries digitally",
+            "As a driver, I want to communicate with dispatch",
+            "As a driver, I want to see my schedule",
+            "As a driver, I want to report vehicle issues"
+        ]
+    },
+    {
+        "title": "Analytics & Reporting Dashboard",
+        "description": "Comprehensive analytics for fleet performance, costs, and environmental impact",
+        "stories": 18,
+        "points": 65,
+        "priority": "Medium",
+        "user_stories": [
+            "As a manager, I want to see fleet performance KPIs",
+            "As a CFO, I want cost analysis reports",
+            "As an operator, I want environmental impact metrics",
+            "As an analyst, I want predictive analytics",
+            "As a stakeholder, I want custom reports"
+        ]
+    }
+]
+
+_TRUCKING_SPRINT_PLAN = {
+    "total_sprints": 8,
+    "sprint_duration": "2 weeks",
+    "team_velocity": 30,
+    "total_points": 235,
+    "sprints": [
+        {"number": 1, "focus": "Vehicle Management - Battery & Charging", "points": 30},
+        {"number": 2, "focus": "Vehicle Management - Maintenance & Monitoring", "points": 25},
+        {"number": 3, "focus": "Fleet Tracking - Real-time Location", "points": 30},
+        {"number": 4, "focus": "Fleet Operations - Route Optimization", "points": 30},
+        {"number": 5, "focus": "Driver App - Core Features", "points": 25},
+        {"number": 6, "focus": "Driver App - Advanced Features", "points": 15},
+        {"number": 7, "focus": "Analytics Dashboard - Core Metrics", "points": 30},
+        {"number": 8, "focus": "Analytics Dashboard - Advanced Reports", "points": 35}
+    ]
+}
+
+_TRUCKING_ARCHITECTURE = {
+    "system_architecture": """# System Architecture - Zero-Emission Trucking Platform
 
 ## High-Level Architecture
 
@@ -613,7 +336,7 @@ Check the sidebar for all details! 👉""",
 - MQTT for vehicle telemetry
 - WebSocket for real-time updates
 - AWS IoT Core for device management""",
-                "infrastructure": """# Infrastructure Design
+    "infrastructure": """# Infrastructure Design
 
 ## Environment Structure
 
@@ -643,7 +366,7 @@ Check the sidebar for all details! 👉""",
 - Database: Read replicas for scaling
 - Caching: Multi-layer (Application + CDN)
 - CDN: CloudFront for global distribution""",
-                "security": """# Security Architecture
+    "security": """# Security Architecture
 
 ## Authentication & Authorization
 - OAuth 2.0 + JWT tokens
@@ -668,21 +391,481 @@ Check the sidebar for all details! 👉""",
 - GDPR compliance
 - DOT regulations
 - EPA requirements"""
-            }
-            
-            return {
-                "response": """✅ I've designed a comprehensive Architecture for your Trucking Platform!
-
-**🏗️ System Architecture:**
-- **Microservices Architecture** with 5 core services
-- Vehicle Management, Fleet Operations, Driver, Analytics, Integration
-- Event-driven communication
+}
+
+# Frozen so every response can hand out the same objects
+_TRUCKING_ARTIFACTS = freeze({
+    "project": {
+        "project_template": {
+            "name": "Zero-Emission Trucking Platform",
+            "description": "A trucking project in the automobile industry focusing on modernizing logistics through zero-emission trucks and advanced fleet management software",
+            "industry": "Automobile/Logistics",
+            "type": "Vehicle + Software Platform"
+        }
+    },
+    "requirements": {
+        "prd": _TRUCKING_PRD,
+        "brd": _TRUCKING_BRD,
+        "type": "requirements_documents"
+    },
+    "backlog": {
+        "epics": _TRUCKING_EPICS,
+        "sprint_plan": _TRUCKING_SPRINT_PLAN,
+        "type": "product_backlog"
+    },
+    "architecture": _TRUCKING_ARCHITECTURE
+})
+
+# Name, description, activities, deliverables and AI help for each SDLC phase
+_PHASE_PROMPTS = freeze({
+    1: {
+        "name": "Phase 1: Requirements & Business Analysis",
+        "description": "Define what needs to be built",
+        "key_activities": [
+            "Requirements collection",
+            "PRD & BRD creation",
+            "Risk assessment",
+            "Feasibility analysis"
+        ],
+        "deliverables": ["PRD", "BRD", "Risk Assessment"],
+        "ai_assistance": [
+            "Extract requirements from conversations",
+            "Generate PRD/BRD templates",
+            "Identify risks automatically",
+            "Suggest missing requirements"
+        ]
+    },
+    2: {
+        "name": "Phase 2: Planning & Product Backlog",
+        "description": "Plan effort and create backlog",
+        "key_activities": [
+            "Effort estimation",
+            "Epic creation",
+            "User story breakdown",
+            "Sprint planning"
+        ],
+        "deliverables": ["Product Backlog", "Sprint Plan", "Release Roadmap"],
+        "ai_assistance": [
+            "Auto-generate epics from requirements",
+            "Create user stories",
+            "Estimate story points",
+            "Optimize sprint distribution"
+        ]
+    },
+    3: {
+        "name": "Phase 3: Architecture & High-Level Design",
+        "description": "Design the overall system",
+        "key_activities": [
+            "System architecture",
+            "Technology stack selection",
+            "Infrastructure design",
+            "Security architecture"
+        ],
+        "deliverables": ["Architecture Document", "Infrastructure Blueprint", "Security Plan"],
+        "ai_assistance": [
+            "Suggest architecture patterns",
+            "Recommend tech stack",
+            "Generate architecture diagrams",
+            "Security best practices"
+        ]
+    },
+    4: {
+        "name": "Phase 4: Detailed Design & Specifications",
+        "description": "Create detailed specifications",
+        "key_activities": [
+            "Database design",
+            "API specifications",
+            "UX/UI design",
+            "FSD creation"
+        ],
+        "deliverables": ["DB Schema", "API Specs", "FSD", "UX/UI Designs"],
+        "ai_assistance": [
+            "Generate database schemas",
+            "Create API documentation",
+            "Design wireframes",
+            "Generate FSD"
+        ]
+    },
+    5: {
+        "name": "Phase 5: Development, Testing & Code Review",
+        "description": "Build and test the software",
+        "key_activities": [
+            "Backend development",
+            "Frontend development",
+            "Unit testing",
+            "Integration testing",
+            "QA"
+        ],
+        "deliverables": ["Working Software", "Test Reports", "Code Coverage"],
+        "ai_assistance": [
+            "Generate boilerplate code",
+            "Auto-complete code",
+            "Generate unit tests",
+            "Code review suggestions"
+        ]
+    },
+    6: {
+        "name": "Phase 6: Deployment, Release & Operations",
+        "description": "Release to production and monitor",
+        "key_activities": [
+            "Staging deployment",
+            "Production deployment",
+            "Monitoring setup",
+            "Documentation"
+        ],
+        "deliverables": ["Deployed Application", "Monitoring Dashboard", "Documentation"],
+        "ai_assistance": [
+            "Generate deployment checklist",
+            "Create monitoring dashboards",
+            "Generate documentation",
+            "Suggest optimizations"
+        ]
+    }
+})
+
+# Bulleted lists for each phase's start message, formatted once
+_PHASE_PROMPT_LISTS = MappingProxyType({
+    phase_id: MappingProxyType({
+        key: _format_list(prompts[key]) for key in ("key_activities", "deliverables", "ai_assistance")
+    })
+    for phase_id, prompts in _PHASE_PROMPTS.items()
+})
+
+_APPROVERS_BY_PHASE = MappingProxyType({
+    1: "- Product Owner\n- BR Owner\n- Business Stakeholders",
+    2: "- Project Manager\n- Product Owner\n- Technical Lead",
+    3: "- Solution Architect\n- Technical Architect\n- Security Architect",
+    4: "- Technical Lead\n- Backend Architect\n- Frontend Architect\n- UX Designer",
+    5: "- Technical Lead\n- Senior Developer\n- QA Lead\n- Security Team",
+    6: "- DevOps Lead\n- Technical Lead\n- Product Owner"
+})
+
+_APPROVAL_RESPONSE_TEMPLATE = """📋 Let's set up approvals for Phase {phase_id}!
 
-**💻 Technology Stack:**
-- Backend: Python (FastAPI) + PostgreSQL + Redis
-- Frontend: React + TypeScript + React Native
-- Infrastructure: AWS + Kubernetes + Docker
-- Real-time: MQTT + WebSocket for vehicle telemetry
+Based on this phase, you need approvals from:
+{approvers}
+
+Would you like me to:
+1. Create approval requests
+2. Send notifications to stakeholders
+3. Track approval status
+4. Set up reminder workflows"""
+
+# Approval guidance for each known phase, formatted once
+_APPROVAL_RESPONSES = MappingProxyType({
+    phase_id: _APPROVAL_RESPONSE_TEMPLATE.format(phase_id=phase_id, approvers=approvers)
+    for phase_id, approvers in _APPROVERS_BY_PHASE.items()
+})
+
+def _is_trucking(context: Dict[str, Any]) -> bool:
+    """Whether the project description mentions trucking, cached on the context"""
+    if '_is_trucking' not in context:
+        context['_is_trucking'] = 'truck' in (context.get('description') or '').lower()
+    return context['_is_trucking']
+
+class ConversationalAIService:
+    current_phase_prompts = _PHASE_PROMPTS
+    
+    def process_conversational_query(
+        self, 
+        query: str, 
+        project_context: Dict[str, Any],
+        phase_id: int,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Process user query in a conversational manner and provide intelligent responses
+        """
+        # Detect intent
+        intent = self._detect_intent(query, phase_id)
+        
+        # Get phase-specific context
+        phase_context = project_context.get('phases', {}).get(str(phase_id), {})
+        
+        # Generate response based on intent
+        handler = self._INTENT_HANDLERS.get(intent, ConversationalAIService._provide_contextual_help)
+        return handler(self, query, phase_id, project_context)
+    
+    def _detect_intent(self, query: str, phase_id: int) -> str:
+        """Detect user intent from query"""
+        query_lower = query.lower()
+        
+        # Every keyword in the query from one scan, then a set test per intent
+        automaton = _intent_automaton()
+        if automaton is None:
+            found = frozenset(_INTENT_KEYWORD_RE.findall(query_lower))
+        else:
+            found = frozenset(automaton.find_matches_as_strings(query_lower, overlapping=True))
+        return next((intent for intent, keywords in INTENT_KEYWORDS.items() if not keywords.isdisjoint(found)), INTENT_HELP)
+    
+    def _guide_project_creation(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Guide user through project creation"""
+        
+        # Check if trucking project mentioned
+        is_trucking = 'truck' in query.lower()
+        
+        if is_trucking:
+            return {
+                "response": """🚚 Great! Let's create a Zero-Emission Trucking project!
+
+I'll help you set this up. Here's what I understand:
+
+**Project: Zero-Emission Trucking Platform**
+- Focus: Modernizing logistics in the automobile industry
+- Key Features: Zero-emission trucks (ZETs) + Advanced fleet management
+
+Let me ask a few questions to get started:
+
+1️⃣ **What's your primary goal?**
+   - Develop ZET vehicles
+   - Build fleet management software
+   - Both vehicle and software platform
+
+2️⃣ **Target timeline?**
+   - 6 months (MVP)
+   - 12 months (Full release)
+   - 18+ months (Enterprise solution)
+
+3️⃣ **Key stakeholders?**
+   - Product team
+   - Engineering team
+   - Business stakeholders
+   - Regulatory/Compliance team
+
+Just respond naturally, and I'll create the project structure for you! 🎯""",
+                "confidence_score": 95,
+                "action": "await_user_input",
+                "suggested_responses": (
+                    "Both vehicle and software platform, 12 months timeline",
+                    "Fleet management software, 6 months MVP",
+                    "Full enterprise solution with all teams involved"
+                ),
+                "artifacts": _TRUCKING_ARTIFACTS["project"]
+            }
+        else:
+            return {
+                "response": """👋 I'll help you create a new project!
+
+To get started, I need to understand your project better. Tell me:
+
+1. **What are you building?** (e.g., mobile app, web platform, IoT system)
+2. **What problem does it solve?**
+3. **Who are the users?**
+4. **Any specific industry?** (e.g., healthcare, fintech, logistics)
+
+You can answer in any format - I'll understand! 😊
+
+**Example:** "I want to build a trucking platform for zero-emission vehicles with fleet management"
+""",
+                "confidence_score": 85,
+                "action": "await_user_input",
+                "suggested_responses": (
+                    "Healthcare app for patient management",
+                    "E-commerce platform with AI recommendations",
+                    "IoT system for smart buildings"
+                )
+            }
+    
+    def _guide_phase_start(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Guide user through starting a phase"""
+        
+        prompts = self.current_phase_prompts.get(phase_id, {})
+        lists = _PHASE_PROMPT_LISTS.get(phase_id, {})
+        
+        return {
+            "response": f"""✨ Let's start **{prompts['name']}**!
+
+{prompts['description']}
+
+**What we'll accomplish:**
+{lists['key_activities']}
+
+**Deliverables:**
+{lists['deliverables']}
+
+**I can help you with:**
+{lists['ai_assistance']}
+
+What would you like to start with? Just tell me naturally! 🎯""",
+            "confidence_score": 90,
+            "action": "await_user_input",
+            "phase_id": phase_id,
+            "artifacts": prompts
+        }
+    
+    def _generate_phase_content(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate phase-specific content
+        
+        Only the top-level dict is a fresh copy; nested artifacts stay
+        MappingProxyType/tuple values shared across calls, so plain json.dumps
+        fails on the result. FastAPI's jsonable_encoder serializes it.
+        """
+        content = self._phase_content(phase_id, _is_trucking(context), context.get('project_name', 'Your Project'))
+        # Each caller gets its own top-level dict; the nested artifacts are read-only
+        return None if content is None else dict(content)
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _phase_content(phase_id: int, is_trucking: bool, project_name: str) -> Optional[Mapping[str, Any]]:
+        """Phase content, memoized as it depends only on the phase, trucking flag and project name"""
+        if phase_id == 1:
+            content = ConversationalAIService._generate_requirements(is_trucking, project_name)
+        elif phase_id == 2:
+            content = ConversationalAIService._generate_backlog(is_trucking)
+        elif phase_id == 3:
+            content = ConversationalAIService._generate_architecture(is_trucking)
+        elif phase_id == 4:
+            content = ConversationalAIService._generate_detailed_design()
+        elif phase_id == 5:
+            content = ConversationalAIService._generate_code_tests()
+        elif phase_id == 6:
+            content = ConversationalAIService._generate_deployment_plan()
+        else:
+            return None
+        return freeze(content)
+    
+    @staticmethod
+    def _generate_requirements(is_trucking: bool, project_name: str) -> Dict[str, Any]:
+        """Generate Phase 1 content - Requirements"""
+        
+        # For trucking project
+        if is_trucking:
+            return {
+                "response": """✅ I've generated comprehensive requirements for your Zero-Emission Trucking Platform!
+
+**📄 Product Requirements Document (PRD)**
+- Executive Summary
+- Core Features (ZET Management, Fleet Management, Driver Portal, Analytics)
+- Technical Requirements
+- Success Metrics
+
+**📊 Business Requirements Document (BRD)**
+- Business Context & Objectives
+- Stakeholders & Business Rules
+- Budget: $2.5M over 12 months
+- Team Structure (12 people)
+- Risk Assessment
+
+**💡 Key Highlights:**
+✅ 30% cost reduction target
+✅ 100% zero-emission operations
+✅ Real-time tracking & analytics
+✅ Mobile-first approach
+
+**What would you like to do next?**
+1. Review and refine these documents
+2. Add more specific requirements
+3. Move to Phase 2 (Planning & Backlog)
+4. Set up stakeholder approvals
+
+The documents are ready in the sidebar! 👉""",
+                "confidence_score": 92,
+                "action": "content_generated",
+                "artifacts": _TRUCKING_ARTIFACTS["requirements"],
+                "suggested_actions": (
+                    "Review PRD/BRD",
+                    "Refine requirements",
+                    "Move to Phase 2",
+                    "Setup approvals"
+                )
+            }
+        
+        return {
+            "response": f"""📝 Let me generate requirements for {project_name}!
+
+To create comprehensive PRD and BRD, I need a bit more context:
+
+1. **Core features** - What are the main capabilities?
+2. **Users** - Who will use this?
+3. **Business goals** - What's the success criteria?
+
+Tell me more about your project!""",
+            "confidence_score": 75,
+            "action": "await_user_input"
+        }
+    
+    @staticmethod
+    def _generate_backlog(is_trucking: bool) -> Dict[str, Any]:
+        """Generate Phase 2 content - Backlog"""
+        
+        if is_trucking:
+            return {
+                "response": """✅ I've created a comprehensive Product Backlog for your Trucking Platform!
+
+**📊 Backlog Summary:**
+- **4 Epics** covering all major features
+- **65 User Stories** broken down and ready
+- **235 Story Points** estimated
+- **8 Sprints** planned (2-week cycles)
+
+**🎯 Epics Created:**
+
+1️⃣ **Zero-Emission Vehicle Management** (55 pts, High Priority)
+   - Battery monitoring, charging, predictive maintenance
+   - 15 user stories
+
+2️⃣ **Fleet Operations & Tracking** (75 pts, High Priority)
+   - Real-time GPS, route optimization, dispatch
+   - 20 user stories
+
+3️⃣ **Driver Mobile Application** (40 pts, High Priority)
+   - Navigation, delivery confirmation, communication
+   - 12 user stories
+
+4️⃣ **Analytics & Reporting** (65 pts, Medium Priority)
+   - KPIs, cost analysis, environmental impact
+   - 18 user stories
+
+**📅 Sprint Plan:**
+- Duration: 16 weeks (4 months)
+- Team Velocity: 30 points/sprint
+- Deliverables: MVP after Sprint 6, Full release after Sprint 8
+
+**🔗 Ready to export to Jira!**
+
+What's next?
+1. Review and refine the backlog
+2. Export to Jira
+3. Move to Phase 3 (Architecture)
+4. Adjust story points
+
+Check the sidebar for all details! 👉""",
+                "confidence_score": 94,
+                "action": "content_generated",
+                "artifacts": _TRUCKING_ARTIFACTS["backlog"],
+                "suggested_actions": (
+                    "Review backlog",
+                    "Export to Jira",
+                    "Move to Phase 3",
+                    "Refine estimates"
+                )
+            }
+        
+        return {
+            "response": "Let me help you create a product backlog! Tell me about the key features...",
+            "confidence_score": 70,
+            "action": "await_user_input"
+        }
+    
+    @staticmethod
+    def _generate_architecture(is_trucking: bool) -> Dict[str, Any]:
+        """Generate Phase 3 content - Architecture"""
+        
+        if is_trucking:
+            return {
+                "response": """✅ I've designed a comprehensive Architecture for your Trucking Platform!
+
+**🏗️ System Architecture:**
+- **Microservices Architecture** with 5 core services
+- Vehicle Management, Fleet Operations, Driver, Analytics, Integration
+- Event-driven communication
+
+**💻 Technology Stack:**
+- Backend: Python (FastAPI) + PostgreSQL + Redis
+- Frontend: React + TypeScript + React Native
+- Infrastructure: AWS + Kubernetes + Docker
+- Real-time: MQTT + WebSocket for vehicle telemetry
 
 **☁️ Infrastructure:**
 - **Dev**: ~$500/month
@@ -706,13 +889,13 @@ Check the sidebar for all details! 👉""",
 All architecture docs are in the sidebar! 👉""",
                 "confidence_score": 93,
                 "action": "content_generated",
-                "artifacts": architecture,
-                "suggested_actions": [
+                "artifacts": _TRUCKING_ARTIFACTS["architecture"],
+                "suggested_actions": (
                     "Review architecture",
                     "Adjust tech stack",
                     "Move to Phase 4",
                     "Setup AWS account"
-                ]
+                )
             }
         
         return {
@@ -721,45 +904,45 @@ All architecture docs are in the sidebar! 👉""",
             "action": "await_user_input"
         }
     
-    def _generate_detailed_design(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _generate_detailed_design() -> Dict[str, Any]:
         """Generate Phase 4 content - Detailed Design"""
         return {
             "response": "Phase 4: Detailed Design generation...",
             "confidence_score": 85
         }
     
-    def _generate_code_tests(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _generate_code_tests() -> Dict[str, Any]:
         """Generate Phase 5 content - Code & Tests"""
         return {
             "response": "Phase 5: Code and test generation...",
             "confidence_score": 85
         }
     
-    def _generate_deployment_plan(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _generate_deployment_plan() -> Dict[str, Any]:
         """Generate Phase 6 content - Deployment"""
         return {
             "response": "Phase 6: Deployment plan generation...",
             "confidence_score": 85
         }
     
-    def _guide_approval_process(self, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _guide_approval_process(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
         """Guide through approval process"""
+        response = _APPROVAL_RESPONSES.get(phase_id)
+        if response is None:
+            response = _APPROVAL_RESPONSE_TEMPLATE.format(
+                phase_id=phase_id,
+                approvers=self._get_approvers_for_phase(phase_id)
+            )
         return {
-            "response": f"""📋 Let's set up approvals for Phase {phase_id}!
-
-Based on this phase, you need approvals from:
-{self._get_approvers_for_phase(phase_id)}
-
-Would you like me to:
-1. Create approval requests
-2. Send notifications to stakeholders
-3. Track approval status
-4. Set up reminder workflows""",
+            "response": response,
             "confidence_score": 88,
             "action": "await_user_input"
         }
     
-    def _suggest_next_steps(self, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _suggest_next_steps(self, query: str, phase_id: int, context: Dict[str, Any]) -> Dict[str, Any]:
         """Suggest next steps"""
         next_phase = phase_id + 1
         
@@ -825,132 +1008,25 @@ What would you like me to help you with?""",
         }
     
     def _get_approvers_for_phase(self, phase_id: int) -> str:
-        approvers_map = {
-            1: "- Product Owner\n- BR Owner\n- Business Stakeholders",
-            2: "- Project Manager\n- Product Owner\n- Technical Lead",
-            3: "- Solution Architect\n- Technical Architect\n- Security Architect",
-            4: "- Technical Lead\n- Backend Architect\n- Frontend Architect\n- UX Designer",
-            5: "- Technical Lead\n- Senior Developer\n- QA Lead\n- Security Team",
-            6: "- DevOps Lead\n- Technical Lead\n- Product Owner"
-        }
-        return approvers_map.get(phase_id, "- Project stakeholders")
+        return _APPROVERS_BY_PHASE.get(phase_id, "- Project stakeholders")
     
-    def _format_list(self, items: List[str]) -> str:
-        """Format list items with bullets"""
-        return "\n".join([f"  • {item}" for item in items])
-    
-    def _get_phase1_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 1: Requirements & Business Analysis",
-            "description": "Define what needs to be built",
-            "key_activities": [
-                "Requirements collection",
-                "PRD & BRD creation",
-                "Risk assessment",
-                "Feasibility analysis"
-            ],
-            "deliverables": ["PRD", "BRD", "Risk Assessment"],
-            "ai_assistance": [
-                "Extract requirements from conversations",
-                "Generate PRD/BRD templates",
-                "Identify risks automatically",
-                "Suggest missing requirements"
-            ]
-        }
-    
-    def _get_phase2_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 2: Planning & Product Backlog",
-            "description": "Plan effort and create backlog",
-            "key_activities": [
-                "Effort estimation",
-                "Epic creation",
-                "User story breakdown",
-                "Sprint planning"
-            ],
-            "deliverables": ["Product Backlog", "Sprint Plan", "Release Roadmap"],
-            "ai_assistance": [
-                "Auto-generate epics from requirements",
-                "Create user stories",
-                "Estimate story points",
-                "Optimize sprint distribution"
-            ]
-        }
-    
-    def _get_phase3_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 3: Architecture & High-Level Design",
-            "description": "Design the overall system",
-            "key_activities": [
-                "System architecture",
-                "Technology stack selection",
-                "Infrastructure design",
-                "Security architecture"
-            ],
-            "deliverables": ["Architecture Document", "Infrastructure Blueprint", "Security Plan"],
-            "ai_assistance": [
-                "Suggest architecture patterns",
-                "Recommend tech stack",
-                "Generate architecture diagrams",
-                "Security best practices"
-            ]
-        }
-    
-    def _get_phase4_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 4: Detailed Design & Specifications",
-            "description": "Create detailed specifications",
-            "key_activities": [
-                "Database design",
-                "API specifications",
-                "UX/UI design",
-                "FSD creation"
-            ],
-            "deliverables": ["DB Schema", "API Specs", "FSD", "UX/UI Designs"],
-            "ai_assistance": [
-                "Generate database schemas",
-                "Create API documentation",
-                "Design wireframes",
-                "Generate FSD"
-            ]
-        }
-    
-    def _get_phase5_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 5: Development, Testing & Code Review",
-            "description": "Build and test the software",
-            "key_activities": [
-                "Backend development",
-                "Frontend development",
-                "Unit testing",
-                "Integration testing",
-                "QA"
-            ],
-            "deliverables": ["Working Software", "Test Reports", "Code Coverage"],
-            "ai_assistance": [
-                "Generate boilerplate code",
-                "Auto-complete code",
-                "Generate unit tests",
-                "Code review suggestions"
-            ]
-        }
-    
-    def _get_phase6_prompts(self) -> Dict[str, Any]:
-        return {
-            "name": "Phase 6: Deployment, Release & Operations",
-            "description": "Release to production and monitor",
-            "key_activities": [
-                "Staging deployment",
-                "Production deployment",
-                "Monitoring setup",
-                "Documentation"
-            ],
-            "deliverables": ["Deployed Application", "Monitoring Dashboard", "Documentation"],
-            "ai_assistance": [
-                "Generate deployment checklist",
-                "Create monitoring dashboards",
-                "Generate documentation",
-                "Suggest optimizations"
-            ]
-        }
-
+    # Handler for each intent, called as handler(self, query, phase_id, project_context);
+    # any other intent gets contextual help
+    _INTENT_HANDLERS = {
+        INTENT_CREATE_PROJECT: _guide_project_creation,
+        INTENT_START_PHASE: _guide_phase_start,
+        INTENT_GENERATE_CONTENT: _generate_phase_content,
+        INTENT_REVIEW_APPROVAL: _guide_approval_process,
+        INTENT_NEXT_STEPS: _suggest_next_steps
+    }
+
+
+# Singleton instance
+_conversational_ai_service = None
+
+def get_conversational_ai_service() -> ConversationalAIService:
+    """Get or create conversational AI service instance"""
+    global _conversational_ai_service
+    if _conversational_ai_service is None:
+        _conversational_ai_service = ConversationalAIService()
+    return _conversational_ai_service
@@ -2,17 +2,36 @@
 Document Parser Service
 Handles parsing of various document formats (Excel, Word, Text, CSV)
 """
+import io
 import os
-from typing import Dict, List
-import openpyxl
-from docx import Document
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Union
 import csv
 
+# Format backends are imported on first use so only formats actually seen pay the import cost
+@lru_cache(maxsize=None)
+def _openpyxl():
+    import openpyxl
+    return openpyxl
+
+@lru_cache(maxsize=None)
+def _docx_document():
+    from docx import Document
+    return Document
+
 class DocumentParser:
     """Service to parse various document formats"""
     
     def __init__(self):
-        self.supported_formats = ['.xlsx', '.xls', '.docx', '.doc', '.txt', '.csv']
+        self._dispatch = {
+            '.xlsx': self._parse_excel,
+            '.xls': self._parse_excel,
+            '.docx': self._parse_word,
+            '.doc': self._parse_word,
+            '.txt': self._parse_text,
+            '.csv': self._parse_csv,
+        }
+        self.supported_formats = list(self._dispatch)
     
     def parse_document(self, file_path: str, filename: str) -> Dict:
         """
@@ -25,23 +44,40 @@ class DocumentParser:
         Returns:
             Dictionary with parsed content
         """
-        ext = os.path.splitext(filename)[1].lower()
+        return self._parse(file_path, filename)
+    
+    def parse_bytes(self, content: bytes, filename: str) -> Dict:
+        """
+        Parse an in-memory document and extract text content
         
-        if ext in ['.xlsx', '.xls']:
-            return self._parse_excel(file_path)
-        elif ext in ['.docx', '.doc']:
-            return self._parse_word(file_path)
-        elif ext == '.txt':
-            return self._parse_text(file_path)
-        elif ext == '.csv':
-            return self._parse_csv(file_path)
-        else:
+        Args:
+            content: Raw file bytes (e.g. from an UploadFile)
+            filename: Original filename, used to pick the parser
+            
+        Returns:
+            Dictionary with parsed content
+        """
+        return self._parse(io.BytesIO(content), filename)
+    
+    def _parse(self, source: Union[str, BinaryIO], filename: str) -> Dict:
+        """Dispatch to the parser for the file extension"""
+        ext = os.path.splitext(filename)[1].lower()
+        parser = self._dispatch.get(ext)
+        if parser is None:
             raise ValueError(f"Unsupported file format: {ext}")
+        return parser(source, filename)
     
-    def _parse_excel(self, file_path: str) -> Dict:
+    def _read_bytes(self, source: Union[str, BinaryIO]) -> bytes:
+        """Read raw bytes from a file path or file-like object"""
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                return f.read()
+        return source.read()
+    
+    def _parse_excel(self, source: Union[str, BinaryIO], filename: str) -> Dict:
         """Parse Excel files"""
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
+            workbook = _openpyxl().load_workbook(source, data_only=True)
             content = []
             
             for sheet_name in workbook.sheetnames:
@@ -62,7 +98,7 @@ class DocumentParser:
             
             return {
                 'type': 'excel',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'content': content,
                 'text': self._extract_text_from_excel(content)
             }
@@ -78,10 +114,10 @@ class DocumentParser:
                 text_parts.append(' | '.join(row))
         return '\n'.join(text_parts)
     
-    def _parse_word(self, file_path: str) -> Dict:
+    def _parse_word(self, source: Union[str, BinaryIO], filename: str) -> Dict:
         """Parse Word documents"""
         try:
-            doc = Document(file_path)
+            doc = _docx_document()(source)
             paragraphs = []
             tables = []
             
@@ -110,7 +146,7 @@ class DocumentParser:
             
             return {
                 'type': 'word',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'paragraphs': paragraphs,
                 'tables': tables,
                 'text': full_text
@@ -118,55 +154,56 @@ class DocumentParser:
         except Exception as e:
             raise Exception(f"Error parsing Word document: {str(e)}")
     
-    def _parse_text(self, file_path: str) -> Dict:
+    def _parse_text(self, source: Union[str, BinaryIO], filename: str) -> Dict:
         """Parse plain text files"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+            raw = self._read_bytes(source)
+            try:
+                text = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Try with different encoding
+                text = raw.decode('latin-1')
             
             lines = [line.strip() for line in text.split('\n') if line.strip()]
             
             return {
                 'type': 'text',
-                'filename': os.path.basename(file_path),
-                'lines': lines,
-                'text': text
-            }
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                text = f.read()
-            
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            
-            return {
-                'type': 'text',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'lines': lines,
                 'text': text
             }
         except Exception as e:
             raise Exception(f"Error parsing text file: {str(e)}")
     
-    def _parse_csv(self, file_path: str) -> Dict:
+    def _parse_csv(self, source: Union[str, BinaryIO], filename: str) -> Dict:
         """Parse CSV files"""
         try:
             rows = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                csv_reader = csv.reader(f)
-                for row in csv_reader:
-                    if any(row):  # Only add non-empty rows
-                        rows.append(row)
+            decoded = self._read_bytes(source).decode('utf-8')
+            csv_reader = csv.reader(io.StringIO(decoded, newline=''))
+            for row in csv_reader:
+                if any(row):  # Only add non-empty rows
+                    rows.append(row)
             
             # Convert to text
             text = '\n'.join([' | '.join(row) for row in rows])
             
             return {
                 'type': 'csv',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'rows': rows,
                 'text': text
             }
         except Exception as e:
             raise Exception(f"Error parsing CSV file: {str(e)}")
 
+
+# Singleton instance
+_document_parser = None
+
+def get_document_parser() -> DocumentParser:
+    """Get or create document parser instance"""
+    global _document_parser
+    if _document_parser is None:
+        _document_parser = DocumentParser()
+    return _document_parser
@@ -0,0 +1,20 @@
+"""
+Frozen Literals
+Read-only copies of the static dict/list data shared by the AI services
+"""
+from types import MappingProxyType
+from typing import Any
+
+
+def freeze(value: Any) -> Any:
+    """
+    Read-only copy of a literal: dicts become MappingProxyType and lists tuples.
+    
+    json.dumps rejects MappingProxyType; serialize frozen data with FastAPI's
+    jsonable_encoder or convert it back to plain dicts first.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
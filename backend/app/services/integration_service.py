@@ -1,40 +1,62 @@
+import asyncio
 import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 
+# Parallel issue creations per sync, to stay under Jira's rate limit
+JIRA_MAX_CONCURRENCY = 10
+
 class IntegrationService:
     """
     Service for handling third-party integrations
     """
     
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def get_client(self) -> httpx.AsyncClient:
+        """Long-lived pooled client, so repeat calls reuse connections and TLS sessions"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the pooled client (called from the app lifespan)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
     async def test_jira_connection(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Test Jira connection
         """
         try:
+            client = self.get_client()
             url = config.get("url")
             email = config.get("email")
             api_token = config.get("api_token")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{url}/rest/api/3/myself",
-                    auth=(email, api_token),
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    user_data = response.json()
-                    return {
-                        "success": True,
-                        "message": "Connected to Jira successfully",
-                        "user": user_data.get("displayName")
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to connect: {response.status_code}"
-                    }
+            response = await client.get(
+                f"{url}/rest/api/3/myself",
+                auth=(email, api_token),
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                user_data = response.json()
+                return {
+                    "success": True,
+                    "message": "Connected to Jira successfully",
+                    "user": user_data.get("displayName")
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to connect: {response.status_code}"
+                }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -43,6 +65,7 @@ class IntegrationService:
         Sync epics from TAO SDLC to Jira
         """
         try:
+            client = self.get_client()
             url = config.get("url")
             email = config.get("email")
             api_token = config.get("api_token")
@@ -50,38 +73,50 @@ class IntegrationService:
             
             epics = phase_data.get("epics", [])
             created_epics = []
+            failed_epics = []
             
-            async with httpx.AsyncClient() as client:
-                for epic in epics:
-                    # Create epic in Jira
-                    epic_data = {
-                        "fields": {
-                            "project": {"key": project_key},
-                            "summary": epic.get("title", ""),
-                            "description": epic.get("description", ""),
-                            "issuetype": {"name": "Epic"}
-                        }
-                    }
-                    
-                    response = await client.post(
+            # Create the epics in Jira concurrently, at most JIRA_MAX_CONCURRENCY at a time
+            semaphore = asyncio.Semaphore(JIRA_MAX_CONCURRENCY)
+            
+            async def create_epic(epic: Dict[str, Any]) -> httpx.Response:
+                async with semaphore:
+                    return await client.post(
                         f"{url}/rest/api/3/issue",
                         auth=(email, api_token),
-                        json=epic_data,
+                        json={
+                            "fields": {
+                                "project": {"key": project_key},
+                                "summary": epic.get("title", ""),
+                                "description": epic.get("description", ""),
+                                "issuetype": {"name": "Epic"}
+                            }
+                        },
                         timeout=10.0
                     )
-                    
-                    if response.status_code == 201:
-                        created_epic = response.json()
-                        created_epics.append({
-                            "key": created_epic.get("key"),
-                            "id": created_epic.get("id"),
-                            "title": epic.get("title")
-                        })
+            
+            responses = await asyncio.gather(
+                *[create_epic(epic) for epic in epics],
+                return_exceptions=True
+            )
+            
+            for epic, response in zip(epics, responses):
+                if isinstance(response, Exception):
+                    failed_epics.append({"title": epic.get("title"), "error": str(response)})
+                elif response.status_code == 201:
+                    created_epic = response.json()
+                    created_epics.append({
+                        "key": created_epic.get("key"),
+                        "id": created_epic.get("id"),
+                        "title": epic.get("title")
+                    })
+                else:
+                    failed_epics.append({"title": epic.get("title"), "error": f"Failed to create epic: {response.status_code}"})
             
             return {
                 "success": True,
                 "message": f"Created {len(created_epics)} epics in Jira",
-                "epics": created_epics
+                "epics": created_epics,
+                "failed_epics": failed_epics
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -91,27 +126,27 @@ class IntegrationService:
         Test GitHub connection
         """
         try:
+            client = self.get_client()
             token = config.get("token")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://api.github.com/user",
-                    headers={"Authorization": f"token {token}"},
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    user_data = response.json()
-                    return {
-                        "success": True,
-                        "message": "Connected to GitHub successfully",
-                        "user": user_data.get("login")
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to connect: {response.status_code}"
-                    }
+            response = await client.get(
+                "https://api.github.com/user",
+                headers={"Authorization": f"token {token}"},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                user_data = response.json()
+                return {
+                    "success": True,
+                    "message": "Connected to GitHub successfully",
+                    "user": user_data.get("login")
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to connect: {response.status_code}"
+                }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -120,6 +155,7 @@ class IntegrationService:
         Create a GitHub repository
         """
         try:
+            client = self.get_client()
             token = config.get("token")
             owner = config.get("owner")
             
@@ -130,27 +166,26 @@ class IntegrationService:
                 "auto_init": True
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"https://api.github.com/user/repos",
-                    headers={"Authorization": f"token {token}"},
-                    json=repo_data,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 201:
-                    repo = response.json()
-                    return {
-                        "success": True,
-                        "message": "Repository created successfully",
-                        "repo_url": repo.get("html_url"),
-                        "clone_url": repo.get("clone_url")
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to create repository: {response.status_code}"
-                    }
+            response = await client.post(
+                f"https://api.github.com/user/repos",
+                headers={"Authorization": f"token {token}"},
+                json=repo_data,
+                timeout=10.0
+            )
+            
+            if response.status_code == 201:
+                repo = response.json()
+                return {
+                    "success": True,
+                    "message": "Repository created successfully",
+                    "repo_url": repo.get("html_url"),
+                    "clone_url": repo.get("clone_url")
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to create repository: {response.status_code}"
+                }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -159,29 +194,29 @@ class IntegrationService:
         Test Confluence connection
         """
         try:
+            client = self.get_client()
             url = config.get("url")
             email = config.get("email")
             api_token = config.get("api_token")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{url}/wiki/rest/api/user/current",
-                    auth=(email, api_token),
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    user_data = response.json()
-                    return {
-                        "success": True,
-                        "message": "Connected to Confluence successfully",
-                        "user": user_data.get("displayName")
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to connect: {response.status_code}"
-                    }
+            response = await client.get(
+                f"{url}/wiki/rest/api/user/current",
+                auth=(email, api_token),
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                user_data = response.json()
+                return {
+                    "success": True,
+                    "message": "Connected to Confluence successfully",
+                    "user": user_data.get("displayName")
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to connect: {response.status_code}"
+                }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -190,6 +225,7 @@ class IntegrationService:
         Publish documentation to Confluence
         """
         try:
+            client = self.get_client()
             url = config.get("url")
             email = config.get("email")
             api_token = config.get("api_token")
@@ -207,26 +243,34 @@ class IntegrationService:
                 }
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{url}/wiki/rest/api/content",
-                    auth=(email, api_token),
-                    json=page_data,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    page = response.json()
-                    return {
-                        "success": True,
-                        "message": "Page published successfully",
-                        "page_url": f"{url}/wiki{page.get('_links', {}).get('webui')}"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to publish: {response.status_code}"
-                    }
+            response = await client.post(
+                f"{url}/wiki/rest/api/content",
+                auth=(email, api_token),
+                json=page_data,
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                page = response.json()
+                return {
+                    "success": True,
+                    "message": "Page published successfully",
+                    "page_url": f"{url}/wiki{page.get('_links', {}).get('webui')}"
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to publish: {response.status_code}"
+                }
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+# Singleton instance
+_integration_service = None
+
+def get_integration_service() -> IntegrationService:
+    """Get or create integration service instance"""
+    global _integration_service
+    if _integration_service is None:
+        _integration_service = IntegrationService()
+    return _integration_service
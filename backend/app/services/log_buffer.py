@@ -0,0 +1,93 @@
+"""
+Integration Log Buffer
+Batches IntegrationLog rows in memory and inserts them in bulk
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from app.database import AsyncSessionLocal
+from app.models_integrations import IntegrationLog
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop(): the flusher writes everything ahead of it and exits
+_STOP = object()
+
+class LogBuffer:
+    """Queue of pending log rows, flushed every max_batch rows or flush_interval seconds"""
+    
+    def __init__(self, max_batch: int = 100, flush_interval: float = 0.25):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background flusher on the running loop (called from the app lifespan)"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._flusher())
+    
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if self._task is not None:
+            # Rather than cancelling, which could drop a batch mid-flush, let the
+            # flusher finish its current batch and the rows queued before the sentinel
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+    
+    async def put(self, row: Dict[str, Any]):
+        """Queue one IntegrationLog row (column name -> value)"""
+        self.start()
+        await self._queue.put(row)
+    
+    async def _flusher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            self._batch.append(row)
+            deadline = loop.time() + self.flush_interval
+            
+            # Collect more rows until the batch is full or the interval elapses
+            while len(self._batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    await self._flush()
+                    return
+                self._batch.append(row)
+            
+            await self._flush()
+    
+    async def _flush(self):
+        if not self._batch:
+            return
+        rows, self._batch = self._batch, []
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(insert(IntegrationLog), rows)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("Failed to store %d integration logs", len(rows))
+
+# Singleton instance
+_log_buffer = None
+
+def get_log_buffer() -> LogBuffer:
+    """Get or create log buffer instance"""
+    global _log_buffer
+    if _log_buffer is None:
+        _log_buffer = LogBuffer()
+    return _log_buffer
@@ -850,3 +850,14 @@ I'm learning about your project as you add more information!"""
             "sources": ["General AI", "Project Context"],
             "context_type": "project"
         }
+
+
+# Singleton instance
+_rag_chat_service = None
+
+def get_rag_chat_service() -> RAGChatService:
+    """Get or create RAG chat service instance"""
+    global _rag_chat_service
+    if _rag_chat_service is None:
+        _rag_chat_service = RAGChatService()
+    return _rag_chat_service
@@ -0,0 +1,37 @@
+"""
+Create any indexes declared on the models that are missing from an existing database
+(Base.metadata.create_all only creates indexes together with new tables)
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, Base
+from app import models, models_integrations
+
+def create_missing_indexes():
+    """Create declared indexes that do not exist yet"""
+    print("=" * 60)
+    print("Creating Missing Indexes")
+    print("=" * 60)
+    
+    try:
+        # Clears duplicate integration configs before their unique index is created
+        models_integrations.ensure_config_unique_index(engine)
+        
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                index.create(bind=engine, checkfirst=True)
+                print(f"  ✓ {table.name}: {index.name}")
+        
+        print("\n" + "=" * 60)
+        print("Index creation completed! 🎉")
+        print("=" * 60)
+        
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_missing_indexes()
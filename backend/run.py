@@ -0,0 +1,38 @@
+"""
+Production entry point for the TAO SDLC API
+Runs uvicorn with uvloop/httptools and one worker per WEB_CONCURRENCY
+"""
+import multiprocessing
+import os
+import sys
+import uvicorn
+
+MAX_WORKERS = 8
+DEFAULT_PORT = 8000
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default if unset or invalid"""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Error: {name}={value!r} is not an integer, using {default}", file=sys.stderr)
+        return default
+
+def get_worker_count() -> int:
+    """Use WEB_CONCURRENCY if set, otherwise 2 * CPUs + 1 (capped)"""
+    default = min(2 * multiprocessing.cpu_count() + 1, MAX_WORKERS)
+    return max(1, env_int("WEB_CONCURRENCY", default))
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "app.main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=env_int("PORT", DEFAULT_PORT),
+        workers=get_worker_count(),
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )